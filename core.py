@@ -1,7 +1,26 @@
 # работа с API сайта (MyStat)
 
+import hashlib
+import io
+import mimetypes
 import os
+import random
+import shutil
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+    import msvcrt
+
 import requests
+from requests.adapters import HTTPAdapter
 from sqlalchemy import create_engine
 from sqlalchemy.orm import declarative_base, sessionmaker
 
@@ -11,8 +30,61 @@ SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
 BASE_URL = "https://mapi.itstep.org"
+STORAGE_URL = "https://fsx3.itstep.org/api/v1/files"
 LANGUAGE = "ru"
 
+# размеры пула соединений: pool_connections - сколько хостов держать,
+# pool_maxsize - сколько keep-alive соединений держать на один хост
+POOL_CONNECTIONS = 4
+POOL_MAXSIZE = 10
+
+# скачивание файлов: размер буфера, с какого размера файл качается частями и сколько частей
+DOWNLOAD_CHUNK_SIZE = 256 * 1024
+PARALLEL_DOWNLOAD_MIN_SIZE = 4 * 1024 * 1024
+DOWNLOAD_SEGMENTS = 4
+# загрузка: как часто (в байтах) сообщать о прогрессе
+UPLOAD_PROGRESS_STEP = 256 * 1024
+# ответ хранилища на истекший или отозванный file-token
+STORAGE_UNAUTHORIZED = "Токен хранилища недействителен или истек"
+
+# таймауты (соединение, чтение) в секундах; для скачивания и загрузки чтение - пауза между кусками, а не вся передача
+TIMEOUTS = {
+    'default': (5, 30),
+    'auth': (5, 20),
+    'token': (5, 10),
+    'file_token': (5, 15),
+    'marks': (5, 20),
+    'attendance': (5, 20),
+    'leaderboard': (5, 20),
+    'homework': (5, 30),
+    'schedule': (5, 20),
+    'submit': (5, 30),
+    'download': (5, 60),
+    'upload': (5, 120),
+}
+# общий срок (секунды) каждого набора данных дашборда при параллельной загрузке (gather_all)
+GATHER_TIMEOUTS = {
+    'grades': 15,
+    'leaderboard': 15,
+    'homework': 30,
+    'schedule': 15,
+    'attendance': 20,
+}
+# размыкатель цепи: после BREAKER_FAILURES ошибок подряд запросы к хосту не отправляются BREAKER_COOLDOWN секунд
+BREAKER_FAILURES = 5
+BREAKER_COOLDOWN = 30
+# повторы идемпотентных запросов (GET/HEAD): попытки, база и потолок паузы, на какие статусы
+RETRY_ATTEMPTS = 3
+RETRY_BASE_DELAY = 0.5
+RETRY_MAX_DELAY = 8
+RETRY_AFTER_MAX = 60
+RETRY_STATUSES = (429, 502, 503, 504)
+# ограничение частоты запросов: RATE_LIMIT в секунду, всплеск до RATE_BURST;
+# с MYSTAT_RATE_LIMIT_FILE лимит общий для всех процессов на машине (файл с блокировкой)
+RATE_LIMIT = 10
+RATE_BURST = 20
+RATE_LIMIT_FILE = os.environ.get("MYSTAT_RATE_LIMIT_FILE")
+
 def _default_headers(token=None):
     headers = {
         'accept': 'application/json, text/plain, */*',
@@ -28,6 +100,314 @@ def _default_headers(token=None):
         headers['authorization'] = f'Bearer {token}'
     return headers
 
+def create_session(pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE, pool_block=False):
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, pool_block=pool_block)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    session.headers.update(_default_headers())
+    return session
+
+class DeadlineExceeded(requests.Timeout):
+    pass
+
+class CircuitOpenError(requests.ConnectionError):
+    pass
+
+class RequestError(str):
+    # текст ошибки в ответе (success, message) вместе с HTTP-статусом; status None - ответа не было (обрыв, таймаут)
+    def __new__(cls, message, status=None):
+        error = super().__new__(cls, message)
+        error.status = status
+        return error
+
+def keep_status(message, error):
+    # переформулированная ошибка сохраняет статус исходной
+    return RequestError(message, error.status) if isinstance(error, RequestError) else message
+
+def is_transient(error):
+    # повторять имеет смысл обрыв, таймаут, 429 и 5xx; остальные 4xx от повтора не исправятся
+    return isinstance(error, RequestError) and (error.status is None or error.status == 429 or error.status >= 500)
+
+class Deadline:
+    # общий срок многошаговой операции: таймаут каждого запроса не больше оставшегося времени
+    def __init__(self, seconds):
+        self.expires_at = time.monotonic() + seconds
+
+    def remaining(self):
+        return self.expires_at - time.monotonic()
+
+    def expired(self):
+        return self.remaining() <= 0
+
+    def clamp(self, timeout):
+        remaining = self.remaining()
+        if remaining <= 0:
+            raise DeadlineExceeded("Превышено время выполнения операции")
+        connect, read = timeout
+        return min(connect, remaining), min(read, remaining)
+
+def request_timeout(endpoint, deadline=None):
+    timeout = TIMEOUTS.get(endpoint, TIMEOUTS['default'])
+    return deadline.clamp(timeout) if deadline is not None else timeout
+
+class CircuitBreaker:
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failures=BREAKER_FAILURES, cooldown=BREAKER_COOLDOWN):
+        self.max_failures = failures
+        self.cooldown = cooldown
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = None
+        self.trips = 0
+        self.rejected = 0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def retry_in(self):
+        if self.state != self.OPEN:
+            return 0
+        return max(0.0, self.opened_at + self.cooldown - time.monotonic())
+
+    def allow(self):
+        # после паузы пропускается один пробный запрос: удачный - цепь замыкается, нет - новая пауза
+        with self._lock:
+            if self.state == self.OPEN:
+                if self.retry_in() > 0:
+                    self.rejected += 1
+                    return False
+                self.state = self.HALF_OPEN
+            if self.state == self.HALF_OPEN:
+                if self._probing:
+                    self.rejected += 1
+                    return False
+                self._probing = True
+            return True
+
+    def record(self, success):
+        with self._lock:
+            self._probing = False
+            if success:
+                self.state = self.CLOSED
+                self.failures = 0
+                return
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.max_failures:
+                if self.state != self.OPEN:
+                    self.trips += 1
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+    def release(self):
+        # запрос не дошел до ответа не по вине хоста (отмена, свой срок операции):
+        # пробный слот освобождается, счетчик ошибок не меняется
+        with self._lock:
+            self._probing = False
+
+    def stats(self):
+        with self._lock:
+            return {
+                'state': self.state,
+                'failures': self.failures,
+                'trips': self.trips,
+                'rejected': self.rejected,
+                'retry_in': round(self.retry_in(), 1),
+            }
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+def circuit_breaker(url):
+    # один размыкатель на хост: сбой хранилища не отключает API и наоборот
+    host = urlparse(url).netloc
+    with _breakers_lock:
+        if host not in _breakers:
+            _breakers[host] = CircuitBreaker()
+        return _breakers[host]
+
+def circuit_stats():
+    with _breakers_lock:
+        breakers = dict(_breakers)
+    return {host: breaker.stats() for host, breaker in breakers.items()}
+
+class _FileLock:
+    # межпроцессная блокировка файла: fcntl на Linux/macOS, msvcrt на Windows
+    def __init__(self, path):
+        self.path = path
+        self.file = None
+
+    def __enter__(self):
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        self.file = os.fdopen(fd, 'r+b')
+        if fcntl is not None:
+            fcntl.flock(self.file.fileno(), fcntl.LOCK_EX)
+        else:
+            msvcrt.locking(self.file.fileno(), msvcrt.LK_LOCK, 1)
+        return self.file
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        try:
+            # записанное должно попасть в файл до снятия блокировки
+            self.file.flush()
+            if fcntl is not None:
+                fcntl.flock(self.file.fileno(), fcntl.LOCK_UN)
+            else:
+                self.file.seek(0)
+                msvcrt.locking(self.file.fileno(), msvcrt.LK_UNLCK, 1)
+        finally:
+            self.file.close()
+
+class TokenBucket:
+    # rate токенов в секунду, не больше capacity; path - состояние в файле, общее для процессов
+    def __init__(self, rate=RATE_LIMIT, capacity=RATE_BURST, path=None):
+        self.rate = rate
+        self.capacity = capacity
+        self.path = path
+        self.tokens = capacity
+        self.updated_at = time.time()
+        self.waits = 0
+        self._lock = threading.Lock()
+
+    def _take(self, tokens, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+        if self.tokens >= tokens:
+            self.tokens -= tokens
+            return 0.0
+        return (tokens - self.tokens) / self.rate
+
+    def reserve(self, tokens=1):
+        # 0 - токен взят; иначе сколько секунд подождать перед следующей попыткой
+        with self._lock:
+            if self.path is None:
+                return self._take(tokens, time.time())
+            with _FileLock(self.path) as file:
+                state = file.read().split()
+                if len(state) == 2:
+                    self.tokens, self.updated_at = float(state[0]), float(state[1])
+                wait = self._take(tokens, time.time())
+                file.seek(0)
+                file.truncate()
+                file.write(f"{self.tokens} {self.updated_at}".encode())
+                return wait
+
+    def acquire(self, tokens=1):
+        wait = self.reserve(tokens)
+        while wait > 0:
+            self.waits += 1
+            time.sleep(wait)
+            wait = self.reserve(tokens)
+
+rate_limiter = TokenBucket(path=RATE_LIMIT_FILE)
+
+def retry_delay(attempt, retry_after=None):
+    # Retry-After (секунды или HTTP-дата) важнее своей паузы; иначе экспонента с полным разбросом
+    if retry_after:
+        try:
+            seconds = float(retry_after)
+        except ValueError:
+            try:
+                seconds = parsedate_to_datetime(retry_after).timestamp() - time.time()
+            except (TypeError, ValueError):
+                seconds = None
+        if seconds is not None:
+            return min(max(seconds, 0.0), RETRY_AFTER_MAX)
+    return random.uniform(0, min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** attempt))
+
+def _http(method, url, token=None, session=None, headers=None, endpoint='default', deadline=None, **kwargs):
+    kwargs.setdefault('timeout', request_timeout(endpoint, deadline))
+    breaker = circuit_breaker(url)
+    if not breaker.allow():
+        raise CircuitOpenError(f"Сервер {urlparse(url).netloc} недоступен, повтор через {breaker.retry_in():.0f} с")
+    rate_limiter.acquire()
+    
+    try:
+        # без сессии - как раньше, отдельное соединение на каждый запрос
+        if session is None:
+            request_headers = _default_headers(token)
+            request_headers.update(headers or {})
+            response = requests.request(method, url, headers=request_headers, **kwargs)
+        else:
+            request_headers = dict(headers or {})
+            if token:
+                request_headers['authorization'] = f'Bearer {token}'
+            response = session.request(method, url, headers=request_headers, **kwargs)
+    except DeadlineExceeded:
+        breaker.release()
+        raise
+    except (requests.ConnectionError, requests.Timeout):
+        # сбоем хоста считаются только обрыв, таймаут и 5xx
+        breaker.record(False)
+        raise
+    except BaseException:
+        # TransferCancelled и прочие ошибки на стороне клиента
+        breaker.release()
+        raise
+    breaker.record(response.status_code < 500)
+    return response
+
+def _http_retry(method, url, token=None, session=None, attempts=RETRY_ATTEMPTS, deadline=None, **kwargs):
+    # только для идемпотентных запросов: повтор при обрыве, таймауте и статусах RETRY_STATUSES
+    for attempt in range(attempts):
+        last = attempt + 1 >= attempts
+        try:
+            response = _http(method, url, token, session, deadline=deadline, **kwargs)
+        except (CircuitOpenError, DeadlineExceeded):
+            raise
+        except (requests.ConnectionError, requests.Timeout):
+            delay = retry_delay(attempt)
+            if last or (deadline is not None and delay >= deadline.remaining()):
+                raise
+        else:
+            if last or response.status_code not in RETRY_STATUSES:
+                return response
+            delay = retry_delay(attempt, response.headers.get('Retry-After'))
+            if deadline is not None and delay >= deadline.remaining():
+                return response
+            response.close()
+        print(f"Повтор запроса через {delay:.1f} с: {url}")
+        time.sleep(delay)
+
+def cache_key(endpoint, url, params=None):
+    return (endpoint, url, tuple(sorted((params or {}).items())))
+
+def _get_json(endpoint, url, token, session=None, params=None, cache=None):
+    if cache is None:
+        return handle_response(_http_retry('GET', url, token, session, params=params, endpoint=endpoint))
+    
+    key = cache_key(endpoint, url, params)
+    entry = cache.lookup(key)
+    if entry is not None and entry.is_fresh():
+        return entry.data
+    
+    validators = entry.validators() if entry is not None else None
+    # есть что показать из кэша - без повторов, сразу устаревшие данные
+    attempts = 1 if entry is not None else RETRY_ATTEMPTS
+    try:
+        response = _http_retry('GET', url, token, session, attempts, params=params, headers=validators,
+                               endpoint=endpoint)
+    except requests.RequestException as e:
+        # сеть или сервер недоступны (или цепь разомкнута) - устаревшие данные лучше, чем ожидание
+        if entry is None:
+            raise
+        print(f"API недоступен ({e}), показаны сохраненные данные: {endpoint}")
+        return entry.data
+    if response.status_code == 304 and entry is not None:
+        cache.revalidated(key)
+        return entry.data
+    if response.status_code >= 500 and entry is not None:
+        print(f"Ошибка {response.status_code}, показаны сохраненные данные: {endpoint}")
+        return entry.data
+    
+    data = handle_response(response)
+    if data is not None:
+        cache.store(key, data, len(response.content),
+                    response.headers.get('ETag'), response.headers.get('Last-Modified'))
+    return data
+
 def handle_response(response):
     if response.status_code == 200:
         return response.json()
@@ -35,12 +415,12 @@ def handle_response(response):
         print(f"Ошибка {response.status_code}: {response.text}")
         return None
 
-def get_auth(login, password):
+def get_auth(login, password, session=None):
     url = f'{BASE_URL}/v1/mystat/auth/login'
     payload = {"login": login, "password": password}
     
     print(f"Вход в систему: {login}")
-    response = requests.post(url, json=payload, headers=_default_headers())
+    response = _http('POST', url, json=payload, session=session, endpoint='auth')
     
     if response.status_code == 200:
         print("Успешный вход в систему")
@@ -49,12 +429,14 @@ def get_auth(login, password):
         print(f"Ошибка входа: {response.status_code}")
         return False, None
 
-def get_marks(token, campus):
+def get_marks(token, campus, session=None, cache=None):
     url = f'{BASE_URL}/v1/mystat/{campus}/statistic/marks'
-    return handle_response(requests.get(url, headers=_default_headers(token)))
+    return _get_json('marks', url, token, session, cache=cache)
+
+def calc_avr_mark(token, campus, session=None):
+    return average_of_marks(get_marks(token, campus, session))
 
-def calc_avr_mark(token, campus):
-    marks_data = get_marks(token, campus)
+def average_of_marks(marks_data):
     if not marks_data:
         return None
     
@@ -68,79 +450,260 @@ def calc_avr_mark(token, campus):
     
     return sum(marks) / len(marks) if marks else None
 
-def get_attendance(token, campus, period="month"):
+def get_attendance(token, campus, period="month", session=None, cache=None):
     url = f"{BASE_URL}/v1/mystat/{campus}/statistic/attendance"
     params = {"period": period}
-    response = requests.get(url, headers=_default_headers(token), params=params)
-    return handle_response(response)
+    return _get_json('attendance', url, token, session, params, cache)
 
-def get_leaderboard(token, campus):
+def get_leaderboard(token, campus, session=None, cache=None):
     url = f'{BASE_URL}/v1/mystat/{campus}/progress/leader-table'
-    return handle_response(requests.get(url, headers=_default_headers(token)))
+    return _get_json('leaderboard', url, token, session, cache=cache)
 
-def get_homework(token, campus, status=3, limit=1000, sort='-hw.time'):
+def get_homework(token, campus, status=3, limit=1000, sort='-hw.time', session=None, cache=None, page=None):
     url = f'{BASE_URL}/v1/mystat/{campus}/homework/list'
     params = {
         'status': status,
         'limit': limit,
         'sort': sort
     }
-    response = requests.get(url, headers=_default_headers(token), params=params)
-    return handle_response(response)
-
-def get_schedule(token, week=True, date=None, campus='aqtobe'):
-    type_param = 'week' if week else 'month'
-    date_filter = date or ''
-    url = f"{BASE_URL}/v1/mystat/{campus}/schedule/get-month?type={type_param}&date_filter={date_filter}"
-    data = handle_response(requests.get(url, headers=_default_headers(token)))
+    if page:
+        params['page'] = page
+    return _get_json('homework', url, token, session, params, cache)
+
+def get_schedule(token, week=True, date=None, campus='aqtobe', session=None, cache=None):
+    url = f"{BASE_URL}/v1/mystat/{campus}/schedule/get-month"
+    params = {
+        'type': 'week' if week else 'month',
+        'date_filter': date or ''
+    }
+    data = _get_json('schedule', url, token, session, params, cache)
     if data:
         return data.get('data', data)
     return None
 
-def download_file(file_url, save_path, token=None):
+class TransferCancelled(Exception):
+    pass
+
+class _RangeNotSatisfiable(Exception):
+    # ответ 416 на докачку: .part не соответствует файлу на сервере
+    pass
+
+class _DownloadProgress:
+    def __init__(self, total, callback, cancelled):
+        self.total = total
+        self.done = 0
+        self.callback = callback
+        self.cancelled = cancelled
+        # тело пришло сжатым вопреки identity - его длина не совпадает с Content-Length, размер не сверяется
+        self.encoded = False
+        self._lock = threading.Lock()
+
+    def add(self, size):
+        with self._lock:
+            self.done += size
+            done = self.done
+        if self.callback:
+            self.callback(done, self.total)
+
+    def check(self):
+        if self.cancelled and self.cancelled():
+            raise TransferCancelled()
+
+def _remove_parts(part_path, segments):
+    for path in [part_path, part_path + '.etag'] + [f'{part_path}{index}' for index in range(segments)]:
+        if os.path.exists(path):
+            os.remove(path)
+
+def _discard_stale_parts(part_path, etag, segments):
+    # недокачанные части годятся, только если файл на сервере тот же (ETag записан рядом с .part)
+    marker = part_path + '.etag'
+    previous = None
+    if os.path.exists(marker):
+        with open(marker) as file:
+            previous = file.read()
+    if previous == (etag or ''):
+        return
+    _remove_parts(part_path, segments)
+    with open(marker, 'w') as file:
+        file.write(etag or '')
+
+def _content_encoded(response):
+    return response.headers.get('Content-Encoding', 'identity').lower() not in ('', 'identity')
+
+def _download_request(method, file_url, token, session, headers=None, **kwargs):
+    # файл просится без сжатия: Content-Length, Range и размер .part считаются в байтах самого файла
+    headers = dict(headers or {}, **{'Accept-Encoding': 'identity'})
+    if session is None and not token:
+        return requests.request(method, file_url, headers=headers, timeout=request_timeout('download'), **kwargs)
+    return _http(method, file_url, token, session, headers=headers, endpoint='download', **kwargs)
+
+def _probe_download(file_url, token, session):
+    # размер, поддержка Range и ETag файла; сервер без HEAD - качаем одним потоком как раньше
+    try:
+        response = _download_request('HEAD', file_url, token, session, allow_redirects=True)
+    except requests.RequestException:
+        return None, False, None
+    if response.status_code != 200:
+        return None, False, None
+    length = response.headers.get('Content-Length')
+    total = int(length) if length and length.isdigit() else None
+    ranges = response.headers.get('Accept-Ranges', '').lower() == 'bytes'
+    return total, ranges, response.headers.get('ETag')
+
+def _write_stream(response, path, mode, chunk_size, progress):
+    if _content_encoded(response):
+        progress.encoded = True
+    with response, open(path, mode) as file:
+        for chunk in response.iter_content(chunk_size=chunk_size):
+            progress.check()
+            file.write(chunk)
+            progress.add(len(chunk))
+
+def _download_stream(file_url, part_path, token, session, ranges, etag, chunk_size, progress):
+    # докачка с конца .part; If-Range - если файл на сервере поменялся, придет целиком (200)
+    offset = os.path.getsize(part_path) if ranges and os.path.exists(part_path) else 0
+    if offset and progress.total is not None:
+        if offset == progress.total:
+            # .part уже докачан (сбой между последним куском и переименованием) - дальше только проверка размера
+            progress.add(offset)
+            return
+        if offset > progress.total:
+            # .part больше файла - докачивать нечего, только заново
+            offset = 0
+    headers = {}
+    if offset:
+        headers['Range'] = f'bytes={offset}-'
+        if etag:
+            headers['If-Range'] = etag
+    response = _download_request('GET', file_url, token, session, headers=headers, stream=True)
+    if response.status_code == 416:
+        response.close()
+        raise _RangeNotSatisfiable()
+    response.raise_for_status()
+    if response.status_code != 206:
+        offset = 0
+    if progress.total is None and not _content_encoded(response):
+        length = response.headers.get('Content-Length')
+        if length and length.isdigit():
+            progress.total = offset + int(length)
+    progress.add(offset)
+    _write_stream(response, part_path, 'ab' if offset else 'wb', chunk_size, progress)
+
+def _download_segment(file_url, segment_path, start, end, token, session, etag, chunk_size, progress):
+    size = end - start + 1
+    done = os.path.getsize(segment_path) if os.path.exists(segment_path) else 0
+    if done > size:
+        done = 0
+    progress.add(done)
+    if done == size:
+        return
+    headers = {'Range': f'bytes={start + done}-{end}'}
+    if etag:
+        headers['If-Range'] = etag
+    response = _download_request('GET', file_url, token, session, headers=headers, stream=True)
+    if response.status_code == 416:
+        response.close()
+        raise _RangeNotSatisfiable()
+    response.raise_for_status()
+    if response.status_code != 206:
+        response.close()
+        raise IOError("сервер не отдал запрошенную часть файла")
+    _write_stream(response, segment_path, 'ab' if done else 'wb', chunk_size, progress)
+
+def _download_segments(file_url, part_path, token, session, etag, segments, chunk_size, progress):
+    # каждая часть пишется в свой .partN и докачивается отдельно, затем части склеиваются
+    total = progress.total
+    step = -(-total // segments)
+    bounds = [(start, min(start + step, total) - 1) for start in range(0, total, step)]
+    paths = [f'{part_path}{index}' for index in range(len(bounds))]
+    with ThreadPoolExecutor(max_workers=len(bounds)) as pool:
+        futures = [
+            pool.submit(_download_segment, file_url, path, start, end, token, session, etag, chunk_size, progress)
+            for path, (start, end) in zip(paths, bounds)
+        ]
+        for future in futures:
+            future.result()
+
+    with open(part_path, 'wb') as file:
+        for path in paths:
+            with open(path, 'rb') as segment:
+                shutil.copyfileobj(segment, file, chunk_size)
+    for path in paths:
+        os.remove(path)
+
+def download_file(file_url, save_path, token=None, session=None, chunk_size=DOWNLOAD_CHUNK_SIZE,
+                  segments=DOWNLOAD_SEGMENTS, progress_callback=None, cancelled=None, probe=None):
+    # progress_callback(скачано, всего) - всего None, если размер неизвестен;
+    # cancelled() -> True прерывает скачивание, .part остается для докачки;
+    # probe - уже полученный результат _probe_download, чтобы не повторять HEAD
+    part_path = save_path + '.part'
     try:
-        headers = _default_headers(token) if token else {}
-        response = requests.get(file_url, headers=headers, stream=True)
-        response.raise_for_status()
+        save_dir = os.path.dirname(save_path)
+        if save_dir:
+            os.makedirs(save_dir, exist_ok=True)
+        
+        total, ranges, etag = probe if probe is not None else _probe_download(file_url, token, session)
+        progress = _DownloadProgress(total, progress_callback, cancelled)
+        progress.check()
         
-        os.makedirs(os.path.dirname(save_path), exist_ok=True)
+        for attempt in range(2):
+            _discard_stale_parts(part_path, etag, segments)
+            try:
+                if ranges and total and segments > 1 and total >= PARALLEL_DOWNLOAD_MIN_SIZE:
+                    _download_segments(file_url, part_path, token, session, etag, segments, chunk_size, progress)
+                else:
+                    _download_stream(file_url, part_path, token, session, ranges, etag, chunk_size, progress)
+                break
+            except _RangeNotSatisfiable:
+                if attempt:
+                    raise
+                # сервер отверг докачку (416) - части удаляются, файл качается заново
+                print(f"Докачка отклонена сервером, скачивание заново: {file_url}")
+                _remove_parts(part_path, segments)
+                progress.done = 0
         
-        with open(save_path, 'wb') as file:
-            for chunk in response.iter_content(chunk_size=8192):
-                file.write(chunk)
+        size = os.path.getsize(part_path)
+        if progress.total is not None and not progress.encoded and size != progress.total:
+            os.remove(part_path)
+            os.remove(part_path + '.etag')
+            return False, f"Ошибка скачивания файла: получено {size} из {progress.total} байт"
         
+        os.replace(part_path, save_path)
+        os.remove(part_path + '.etag')
         return True, f"Файл успешно скачан: {save_path}"
+    except TransferCancelled:
+        return False, "Скачивание отменено"
     except Exception as e:
         return False, f"Ошибка скачивания файла: {str(e)}"
 
-def check_token_validity(token, campus):
+def check_token_validity(token, campus, session=None, deadline=None):
     if not token:
         return False, "Токен не предоставлен"
     
+    # HEAD вместо GET: статус тот же, но без тела со всеми оценками
     url = f'{BASE_URL}/v1/mystat/{campus}/statistic/marks'
-    headers = _default_headers(token)
-    
-    response = requests.get(url, headers=headers)
+    response = _http_retry('HEAD', url, token, session, endpoint='token', deadline=deadline)
+    if response.status_code in (405, 501):
+        response = _http_retry('GET', url, token, session, endpoint='token', deadline=deadline)
     
     if response.status_code == 200:
         return True, "Токен действителен"
     elif response.status_code == 401:
-        return False, "Токен авторизации недействителен или истек"
+        return False, RequestError("Токен авторизации недействителен или истек", 401)
     else:
-        return False, f"Ошибка проверки токена: {response.status_code}"
+        return False, RequestError(f"Ошибка проверки токена: {response.status_code}", response.status_code)
 
-def get_file_token(token, campus):
+def get_file_token(token, campus, session=None, validate=True, deadline=None):
     if not token:
         return False, "Токен не предоставлен"
     
-    is_valid, message = check_token_validity(token, campus)
-    if not is_valid:
-        return False, message
+    if validate:
+        is_valid, message = check_token_validity(token, campus, session, deadline)
+        if not is_valid:
+            return False, message
     
     url = f'{BASE_URL}/v1/mystat/{campus}/user/file-token'
-    headers = _default_headers(token)
-    
-    response = requests.get(url, headers=headers)
+    response = _http_retry('GET', url, token, session, endpoint='file_token', deadline=deadline)
     
     if response.status_code == 200:
         result = response.json()
@@ -156,24 +719,107 @@ def get_file_token(token, campus):
         else:
             return False, "Токен файла или директория не найдены в ответе"
     elif response.status_code == 401:
-        return False, "Токен авторизации недействителен или истек. Попробуйте войти заново."
+        return False, RequestError("Токен авторизации недействителен или истек. Попробуйте войти заново.", 401)
     else:
-        return False, f"Ошибка получения токена: {response.status_code} - {response.text}"
+        return False, RequestError(f"Ошибка получения токена: {response.status_code} - {response.text}",
+                                   response.status_code)
 
-def upload_file_to_storage(file_path, file_token, homework_dir_id):
-    try:
-        upload_url = "https://fsx3.itstep.org/api/v1/files"
+def file_sha256(file_path, chunk_size=DOWNLOAD_CHUNK_SIZE):
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as file:
+        for chunk in iter(lambda: file.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def _form_param(value):
+    # экранирование имени в заголовке части, как у браузеров (HTML5)
+    return str(value).replace('\\', '\\\\').replace('"', '%22').replace('\r', '%0D').replace('\n', '%0A')
+
+class MultipartFileEncoder:
+    # multipart/form-data потоком: requests читает тело через read(size), файл целиком в память не попадает
+    def __init__(self, file_path, fields=None, file_field='files[]', progress_callback=None, cancelled=None,
+                 progress_step=UPLOAD_PROGRESS_STEP):
+        boundary = uuid.uuid4().hex
+        self.content_type = f'multipart/form-data; boundary={boundary}'
+        self.progress_callback = progress_callback
+        self.cancelled = cancelled
+        self.progress_step = progress_step
         
-        headers = {
-            'Authorization': f'Bearer {file_token}',
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
+        head = b''
+        for name, value in (fields or {}).items():
+            head += (f'--{boundary}\r\nContent-Disposition: form-data; name="{_form_param(name)}"\r\n\r\n'
+                     f'{value}\r\n').encode()
+        filename = os.path.basename(file_path)
+        mime_type = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+        head += (f'--{boundary}\r\nContent-Disposition: form-data; name="{_form_param(file_field)}"; '
+                 f'filename="{_form_param(filename)}"\r\nContent-Type: {mime_type}\r\n\r\n').encode()
+        tail = f'\r\n--{boundary}--\r\n'.encode()
+        
+        self.total = len(head) + os.path.getsize(file_path) + len(tail)
+        self._parts = [io.BytesIO(head), open(file_path, 'rb'), io.BytesIO(tail)]
+        self._index = 0
+        self.sent = 0
+        self._reported = 0
+        self._started = None
+        
+    def __len__(self):
+        return self.total
+    
+    def read(self, size=-1):
+        if self.cancelled and self.cancelled():
+            raise TransferCancelled()
+        if self._started is None:
+            self._started = time.monotonic()
+        if size is None or size < 0:
+            size = self.total - self.sent
+        
+        chunks = []
+        while size > 0 and self._index < len(self._parts):
+            chunk = self._parts[self._index].read(size)
+            if not chunk:
+                self._index += 1
+                continue
+            chunks.append(chunk)
+            size -= len(chunk)
+        data = b''.join(chunks)
+        
+        self.sent += len(data)
+        if self.progress_callback and (self.sent - self._reported >= self.progress_step or
+                                       (data and self.sent == self.total)):
+            self._reported = self.sent
+            elapsed = time.monotonic() - self._started
+            self.progress_callback(self.sent, self.total, self.sent / elapsed if elapsed > 0 else 0.0)
+        return data
+    
+    def close(self):
+        for part in self._parts:
+            part.close()
+            
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
 
-        with open(file_path, 'rb') as file:
-            files = {'files[]': file}
-            data = {'directory': homework_dir_id}
+def upload_file_to_storage(file_path, file_token, homework_dir_id, session=None,
+                           progress_callback=None, cancelled=None, deadline=None):
+    # progress_callback(отправлено, всего, байт/с); cancelled() -> True прерывает загрузку
+    def stopped():
+        return bool(cancelled and cancelled()) or (deadline is not None and deadline.expired())
+    
+    try:
+        upload_url = STORAGE_URL
+        
+        with MultipartFileEncoder(file_path, {'directory': homework_dir_id},
+                                  progress_callback=progress_callback, cancelled=stopped) as body:
+            headers = {
+                'Authorization': f'Bearer {file_token}',
+                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+                'content-type': body.content_type
+            }
             
-            response = requests.post(upload_url, files=files, data=data, headers=headers)
+            response = _http('POST', upload_url, session=session, headers=headers, data=body,
+                             endpoint='upload', deadline=deadline)
             
             if response.status_code == 200:
                 result = response.json()
@@ -186,13 +832,23 @@ def upload_file_to_storage(file_path, file_token, homework_dir_id):
                         return False, "URL файла не найден в ответе"
                 else:
                     return False, "Неожиданный ответ от сервера"
+            elif response.status_code == 401:
+                return False, RequestError(STORAGE_UNAUTHORIZED, 401)
             else:
-                return False, f"Ошибка загрузки файла: {response.status_code} - {response.text}"
+                return False, RequestError(f"Ошибка загрузки файла: {response.status_code} - {response.text}",
+                                           response.status_code)
                 
     except Exception as e:
+        if cancelled and cancelled():
+            return False, "Загрузка отменена"
+        if deadline is not None and deadline.expired():
+            return False, RequestError("Превышено время загрузки файла")
+        if isinstance(e, requests.RequestException):
+            return False, RequestError(f"Ошибка загрузки файла: {str(e)}")
         return False, f"Ошибка загрузки файла: {str(e)}"
 
-def submit_homework(token, campus, homework_id, file_url=None, answer_text=None):
+def submit_homework(token, campus, homework_id, file_url=None, answer_text=None, session=None, idempotency_key=None,
+                    deadline=None):
     try:
         url = f'{BASE_URL}/v1/mystat/{campus}/homework/create'
         
@@ -201,13 +857,18 @@ def submit_homework(token, campus, homework_id, file_url=None, answer_text=None)
             'answerText': answer_text,
             'filename': file_url
         }
+        # один ключ на все повторы одной отправки - сервер может распознать дубль
+        headers = {'Idempotency-Key': idempotency_key} if idempotency_key else None
         
-        response = requests.post(url, json=payload, headers=_default_headers(token))
+        response = _http('POST', url, token, session, headers=headers, json=payload, endpoint='submit', deadline=deadline)
         
         if response.status_code in [200, 201]:
             return True, "Задание успешно отправлено на проверку"
         else:
-            return False, f"Ошибка отправки задания: {response.status_code} - {response.text}"
+            return False, RequestError(f"Ошибка отправки задания: {response.status_code} - {response.text}",
+                                       response.status_code)
             
+    except requests.RequestException as e:
+        return False, RequestError(f"Ошибка отправки задания: {str(e)}")
     except Exception as e:
         return False, f"Ошибка отправки задания: {str(e)}"
@@ -0,0 +1,362 @@
+# асинхронный клиент MyStat (aiohttp): те же методы, что и у MystatInterface
+
+import asyncio
+import json
+import os
+
+import aiohttp
+
+from core import (BASE_URL, STORAGE_URL, POOL_MAXSIZE, RETRY_ATTEMPTS, RETRY_STATUSES, GATHER_TIMEOUTS,
+                  _default_headers, average_of_marks, cache_key, circuit_breaker, rate_limiter, request_timeout,
+                  retry_delay)
+from interface.token_manager import TokenManager
+from interface.single_flight import request_key
+
+class AsyncMystatInterface:
+    def __init__(self, login, password, campus='aqtobe', pool_maxsize=POOL_MAXSIZE):
+        self.login = login
+        self.password = password
+        self.campus = campus
+        self.tokens = TokenManager()
+        self.pool_maxsize = pool_maxsize
+        self.flights = None
+        self.cache = None
+        self._session = None
+
+    @classmethod
+    def from_client(cls, client):
+        async_client = cls(client.login, client.password, client.campus)
+        async_client.token = client.token
+        # общие с синхронным клиентом результаты: повторные вызовы client не пойдут в API
+        async_client.flights = client.flights
+        async_client.cache = client.cache
+        return async_client
+
+    @property
+    def token(self):
+        return self.tokens.token
+
+    @token.setter
+    def token(self, token):
+        self.tokens.set_token(token)
+
+    def _get_session(self):
+        if self._session is None or self._session.closed:
+            headers = _default_headers()
+            # content-type выставляется на каждый запрос: json или multipart
+            headers.pop('content-type')
+            connector = aiohttp.TCPConnector(limit_per_host=self.pool_maxsize)
+            self._session = aiohttp.ClientSession(headers=headers, connector=connector)
+        return self._session
+
+    def _timeout(self, endpoint):
+        connect, read = request_timeout(endpoint)
+        return aiohttp.ClientTimeout(sock_connect=connect, sock_read=read)
+
+    def _auth_headers(self):
+        return {'authorization': f'Bearer {self.token}'} if self.token else {}
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    async def _get_json(self, endpoint, url, params=None):
+        key = cache_key(endpoint, url, params)
+        entry = self.cache.lookup(key) if self.cache is not None else None
+        if entry is not None and entry.is_fresh():
+            return entry.data
+
+        headers = self._auth_headers()
+        if entry is not None:
+            headers.update(entry.validators())
+
+        # тот же размыкатель и лимит частоты, что и у синхронного клиента;
+        # есть что показать из кэша - без повторов, при сбое сразу сохраненные данные
+        breaker = circuit_breaker(url)
+        attempts = 1 if entry is not None else RETRY_ATTEMPTS
+        for attempt in range(attempts):
+            last = attempt + 1 >= attempts
+            if not breaker.allow():
+                if entry is not None:
+                    return entry.data
+                print(f"API недоступен, повтор через {breaker.retry_in():.0f} с: {endpoint}")
+                return None
+            await self._rate_limit()
+
+            retry_after = None
+            try:
+                session = self._get_session()
+                async with session.get(url, params=params, headers=headers, timeout=self._timeout(endpoint)) as response:
+                    breaker.record(response.status < 500)
+                    if response.status in RETRY_STATUSES and not last:
+                        retry_after = response.headers.get('Retry-After')
+                    else:
+                        return await self._read_json(endpoint, key, entry, response)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                breaker.record(False)
+                if entry is not None:
+                    print(f"API недоступен ({e!r}), показаны сохраненные данные: {endpoint}")
+                    return entry.data
+                if last:
+                    raise
+            except BaseException:
+                # отмена задачи (таймаут gather_all) - хост тут ни при чем
+                breaker.release()
+                raise
+
+            delay = retry_delay(attempt, retry_after)
+            print(f"Повтор запроса через {delay:.1f} с: {url}")
+            await asyncio.sleep(delay)
+
+    async def _read_json(self, endpoint, key, entry, response):
+        if response.status == 304 and entry is not None:
+            self.cache.revalidated(key)
+            return entry.data
+        if response.status >= 500 and entry is not None:
+            print(f"Ошибка {response.status}, показаны сохраненные данные: {endpoint}")
+            return entry.data
+        if response.status != 200:
+            print(f"Ошибка {response.status}: {await response.text()}")
+            return None
+        body = await response.read()
+        data = json.loads(body)
+        if self.cache is not None:
+            self.cache.store(key, data, len(body),
+                             response.headers.get('ETag'), response.headers.get('Last-Modified'))
+        return data
+
+    async def _rate_limit(self):
+        # reserve может ждать блокировку файла лимита (общего для процессов) - не в потоке цикла событий
+        loop = asyncio.get_event_loop()
+        wait = await loop.run_in_executor(None, rate_limiter.reserve)
+        while wait > 0:
+            await asyncio.sleep(wait)
+            wait = await loop.run_in_executor(None, rate_limiter.reserve)
+
+    async def _coalesced(self, key, fetch):
+        if self.flights is None:
+            return await fetch()
+
+        found, data = self.flights.peek(key)
+        if found:
+            return data
+        data = await fetch()
+        self.flights.publish(key, data)
+        return data
+
+    async def authenticate(self):
+        url = f'{BASE_URL}/v1/mystat/auth/login'
+        payload = {"login": self.login, "password": self.password}
+
+        print(f"Вход в систему: {self.login}")
+        session = self._get_session()
+        async with session.post(url, json=payload, timeout=self._timeout('auth')) as response:
+            if response.status == 200:
+                print("Успешный вход в систему")
+                self.token = await response.text()
+                return True
+            print(f"Ошибка входа: {response.status}")
+            return False
+
+    def get_user_info(self):
+        return self.tokens.claims
+
+    async def marks(self):
+        if not self.token:
+            return None
+        url = f'{BASE_URL}/v1/mystat/{self.campus}/statistic/marks'
+        return await self._coalesced(request_key('marks', self.campus), lambda: self._get_json('marks', url))
+
+    async def average_mark(self):
+        return average_of_marks(await self.marks()) if self.token else None
+
+    async def homework(self, status=3, limit=1000, sort='-hw.time', page=None):
+        if not self.token:
+            return None
+        url = f'{BASE_URL}/v1/mystat/{self.campus}/homework/list'
+        params = {'status': status, 'limit': limit, 'sort': sort}
+        if page:
+            params['page'] = page
+        return await self._coalesced(
+            request_key('homework', self.campus, status=status, limit=limit, sort=sort, page=page),
+            lambda: self._get_json('homework', url, params)
+        )
+
+    async def attendance(self, period="month"):
+        if not self.token:
+            return None
+        url = f'{BASE_URL}/v1/mystat/{self.campus}/statistic/attendance'
+        return await self._coalesced(
+            request_key('attendance', self.campus, period=period),
+            lambda: self._get_json('attendance', url, {'period': period})
+        )
+
+    async def leaderboard(self):
+        if not self.token:
+            return None
+        url = f'{BASE_URL}/v1/mystat/{self.campus}/progress/leader-table'
+        return await self._coalesced(request_key('leaderboard', self.campus), lambda: self._get_json('leaderboard', url))
+
+    async def _fetch_schedule(self, week, date):
+        url = f'{BASE_URL}/v1/mystat/{self.campus}/schedule/get-month'
+        params = {'type': 'week' if week else 'month', 'date_filter': date or ''}
+        data = await self._get_json('schedule', url, params)
+        if data:
+            return data.get('data', data)
+        return None
+
+    async def schedule(self, week=True, date=None):
+        if not self.token:
+            return None
+        return await self._coalesced(
+            request_key('schedule', self.campus, week=week, date=date),
+            lambda: self._fetch_schedule(week, date)
+        )
+
+    async def download_homework_file(self, file_url, save_path):
+        if not self.token:
+            return False, "Нет токена авторизации"
+
+        try:
+            session = self._get_session()
+            async with session.get(file_url, headers=self._auth_headers(), timeout=self._timeout('download')) as response:
+                response.raise_for_status()
+
+                os.makedirs(os.path.dirname(save_path), exist_ok=True)
+
+                with open(save_path, 'wb') as file:
+                    async for chunk in response.content.iter_chunked(65536):
+                        file.write(chunk)
+
+            return True, f"Файл успешно скачан: {save_path}"
+        except Exception as e:
+            return False, f"Ошибка скачивания файла: {str(e)}"
+
+    async def check_token_validity(self):
+        result = self.tokens.local_check()
+        if result is not None:
+            return result
+
+        url = f'{BASE_URL}/v1/mystat/{self.campus}/statistic/marks'
+        session = self._get_session()
+        async with session.head(url, headers=self._auth_headers(), timeout=self._timeout('token')) as response:
+            status = response.status
+        if status in (405, 501):
+            async with session.get(url, headers=self._auth_headers(), timeout=self._timeout('token')) as response:
+                status = response.status
+
+        if status == 200:
+            return True, "Токен действителен"
+        elif status == 401:
+            return False, "Токен авторизации недействителен или истек"
+        else:
+            return False, f"Ошибка проверки токена: {status}"
+
+    async def get_file_token(self):
+        if not self.token:
+            return False, "Нет токена авторизации"
+
+        is_valid, message = await self.check_token_validity()
+        if not is_valid:
+            return False, message
+
+        url = f'{BASE_URL}/v1/mystat/{self.campus}/user/file-token'
+        session = self._get_session()
+        async with session.get(url, headers=self._auth_headers(), timeout=self._timeout('file_token')) as response:
+            if response.status == 200:
+                result = await response.json(content_type=None)
+                file_token = result.get('token', '')
+                homework_dir_id = result.get('directories', {}).get('homeworkDirId', '')
+
+                if file_token and homework_dir_id:
+                    return True, {
+                        'token': file_token,
+                        'homework_dir_id': homework_dir_id
+                    }
+                return False, "Токен файла или директория не найдены в ответе"
+            elif response.status == 401:
+                return False, "Токен авторизации недействителен или истек. Попробуйте войти заново."
+            else:
+                return False, f"Ошибка получения токена: {response.status} - {await response.text()}"
+
+    async def upload_file_to_storage(self, file_path, file_token, homework_dir_id):
+        try:
+            headers = {'Authorization': f'Bearer {file_token}'}
+            session = self._get_session()
+
+            with open(file_path, 'rb') as file:
+                form = aiohttp.FormData()
+                form.add_field('files[]', file, filename=os.path.basename(file_path))
+                form.add_field('directory', str(homework_dir_id))
+
+                async with session.post(STORAGE_URL, data=form, headers=headers, timeout=self._timeout('upload')) as response:
+                    if response.status != 200:
+                        return False, f"Ошибка загрузки файла: {response.status} - {await response.text()}"
+                    result = await response.json(content_type=None)
+
+            if not result:
+                return False, "Неожиданный ответ от сервера"
+            file_url = result[0].get('link', '')
+            if not file_url:
+                return False, "URL файла не найден в ответе"
+            print(f"Файл успешно загружен: {file_url}")
+            return True, file_url
+        except Exception as e:
+            return False, f"Ошибка загрузки файла: {str(e)}"
+
+    async def submit_homework(self, homework_id, file_url=None, answer_text=None):
+        if not self.token:
+            return False, "Нет токена авторизации"
+
+        try:
+            url = f'{BASE_URL}/v1/mystat/{self.campus}/homework/create'
+            payload = {
+                'id': homework_id,
+                'answerText': answer_text,
+                'filename': file_url
+            }
+            session = self._get_session()
+            async with session.post(url, json=payload, headers=self._auth_headers(),
+                                    timeout=self._timeout('submit')) as response:
+                if self.flights is not None:
+                    self.flights.forget('homework')
+                if self.cache is not None:
+                    self.cache.invalidate('homework')
+                if response.status in [200, 201]:
+                    return True, "Задание успешно отправлено на проверку"
+                return False, f"Ошибка отправки задания: {response.status} - {await response.text()}"
+        except Exception as e:
+            return False, f"Ошибка отправки задания: {str(e)}"
+
+    async def gather_all(self, timeouts=None, datasets=None):
+        timeouts = dict(GATHER_TIMEOUTS, **(timeouts or {}))
+        fetchers = {
+            'grades': self.marks,
+            'leaderboard': self.leaderboard,
+            'homework': self.homework,
+            'schedule': self.schedule,
+            'attendance': self.attendance,
+        }
+        requests = {name: fetch() for name, fetch in fetchers.items()
+                    if datasets is None or name in datasets}
+
+        results = await asyncio.gather(
+            *(asyncio.wait_for(coro, timeouts[name]) for name, coro in requests.items()),
+            return_exceptions=True
+        )
+
+        data = {}
+        for name, result in zip(requests, results):
+            if isinstance(result, asyncio.TimeoutError):
+                print(f"Превышено время ожидания ({timeouts[name]} с): {name}")
+            elif isinstance(result, Exception):
+                print(f"Ошибка загрузки {name}: {result}")
+            elif result:
+                data[name] = result
+        return data
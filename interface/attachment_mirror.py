@@ -0,0 +1,80 @@
+# зеркало вложений заданий: файлы лежат по sha256 содержимого (objects/ab/abcd...),
+# manifest.json связывает ссылку задания с файлом, ETag и размером
+
+import hashlib
+import json
+import os
+import threading
+import time
+
+from core import file_sha256
+
+MANIFEST_NAME = 'manifest.json'
+
+class AttachmentMirror:
+    def __init__(self, dest_dir):
+        self.dest_dir = dest_dir
+        self.objects_dir = os.path.join(dest_dir, 'objects')
+        self.tmp_dir = os.path.join(dest_dir, 'tmp')
+        self.manifest_path = os.path.join(dest_dir, MANIFEST_NAME)
+        self._lock = threading.Lock()
+        self.files = self._load_manifest()
+
+    def _load_manifest(self):
+        try:
+            with open(self.manifest_path, encoding='utf-8') as file:
+                return json.load(file).get('files', {})
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            print(f"Манифест зеркала поврежден, файлы будут проверены заново: {e}")
+            return {}
+
+    def save_manifest(self):
+        with self._lock:
+            data = json.dumps({'files': self.files}, ensure_ascii=False, indent=2)
+        os.makedirs(self.dest_dir, exist_ok=True)
+        tmp_path = self.manifest_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as file:
+            file.write(data)
+        os.replace(tmp_path, self.manifest_path)
+
+    def object_path(self, sha256):
+        return os.path.join(self.objects_dir, sha256[:2], sha256)
+
+    def lookup(self, file_url):
+        # путь к сохраненному файлу по ссылке задания или None
+        with self._lock:
+            entry = self.files.get(file_url)
+        if entry and os.path.exists(self.object_path(entry['sha256'])):
+            return self.object_path(entry['sha256'])
+        return None
+
+    def is_current(self, file_url, size, etag):
+        # файл не изменился: есть в хранилище и совпадает ETag (или размер, если ETag нет)
+        with self._lock:
+            entry = self.files.get(file_url)
+        if not entry or not os.path.exists(self.object_path(entry['sha256'])):
+            return False
+        if etag and entry.get('etag'):
+            return etag == entry['etag']
+        return size is not None and size == entry.get('size')
+
+    def temp_path(self, file_url):
+        os.makedirs(self.tmp_dir, exist_ok=True)
+        return os.path.join(self.tmp_dir, hashlib.sha1(file_url.encode()).hexdigest())
+
+    def add(self, file_url, downloaded_path, etag=None, **info):
+        # переносит скачанный файл в хранилище; одинаковое содержимое хранится один раз
+        sha256 = file_sha256(downloaded_path)
+        size = os.path.getsize(downloaded_path)
+        object_path = self.object_path(sha256)
+        os.makedirs(os.path.dirname(object_path), exist_ok=True)
+        if os.path.exists(object_path):
+            os.remove(downloaded_path)
+        else:
+            os.replace(downloaded_path, object_path)
+
+        with self._lock:
+            self.files[file_url] = dict(info, sha256=sha256, size=size, etag=etag, mirrored_at=int(time.time()))
+        return object_path
@@ -1,83 +1,375 @@
-from core import (get_auth, get_marks, calc_avr_mark, get_attendance, get_leaderboard, 
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FutureTimeout
+
+import requests
+
+from core import (get_auth, get_marks, average_of_marks, get_attendance, get_leaderboard, 
                  get_homework, get_schedule, download_file, get_file_token, 
-                 upload_file_to_storage, submit_homework, check_token_validity)
+                 upload_file_to_storage, submit_homework, check_token_validity,
+                 create_session, file_sha256, _probe_download, circuit_stats, Deadline, RequestError, keep_status,
+                 POOL_CONNECTIONS, POOL_MAXSIZE, STORAGE_UNAUTHORIZED, GATHER_TIMEOUTS)
+from interface.single_flight import SingleFlight, request_key
+from interface.response_cache import ResponseCache, MAX_BYTES
+from interface.token_manager import TokenManager, FileTokenCache
+from interface.upload_index import UploadIndex
+from interface.attachment_mirror import AttachmentMirror
+
+# общий срок отправки задания (токен, загрузка файла, отправка), секунды
+SUBMIT_TIMEOUT = 30 * 60
 
 class MystatInterface:
-    def __init__(self, login, password, campus='aqtobe'):
+    def __init__(self, login, password, campus='aqtobe',
+                 pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE, coalesce_window=5.0,
+                 cache_max_bytes=MAX_BYTES, cache_ttls=None):
         self.login = login
         self.password = password
         self.campus = campus
-        self.token = None
+        # одна keep-alive сессия на всё время жизни клиента
+        self.session = create_session(pool_connections, pool_maxsize)
+        # claims токена декодируются один раз, срок действия проверяется локально
+        self.tokens = TokenManager(probe=lambda token: check_token_validity(token, self.campus, self.session))
+        # file-token хранилища переиспользуется всеми загрузками до своего истечения
+        self.file_tokens = FileTokenCache(
+            lambda deadline: get_file_token(self.token, self.campus, self.session, validate=False, deadline=deadline))
+        # одинаковые запросы подряд или одновременно идут в API один раз
+        self.flights = SingleFlight(coalesce_window)
+        # свежие ответы отдаются из памяти, устаревшие ревалидируются по ETag/Last-Modified
+        self.cache = ResponseCache(cache_max_bytes, cache_ttls)
+        # уже загруженные файлы (по sha256) не отправляются в хранилище повторно
+        self.uploads = UploadIndex(login)
+        self.submitted_count = 0
+        # длительность этапов последней отправки через submit_pipeline, в секундах
+        self.submission_timings = {}
+        # потоки для gather_all живут вместе с клиентом и ходят через ту же сессию
+        self._gather_pool = ThreadPoolExecutor(max_workers=len(GATHER_TIMEOUTS))
+
+    @property
+    def token(self):
+        return self.tokens.token
+
+    @token.setter
+    def token(self, token):
+        self.tokens.set_token(token)
+
+    def close(self):
+        self._gather_pool.shutdown(wait=False)
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
 
     def authenticate(self):
-        success, token = get_auth(self.login, self.password)
+        success, token = get_auth(self.login, self.password, session=self.session)
         if success:
             self.token = token
             return True
         return False
     
     def get_user_info(self):
-        if not self.token:
-            return None
-        
-        try:
-            import base64
-            import json
-            
-            parts = self.token.split('.')
-            if len(parts) != 3:
-                return None
-                
-            payload = parts[1]
-            padding = len(payload) % 4
-            if padding:
-                payload += '=' * (4 - padding)
-                
-            decoded = base64.urlsafe_b64decode(payload)
-            user_data = json.loads(decoded)
-            
-            return user_data
-        except Exception as e:
-            print(f"Ошибка декодирования токена: {e}")
-            return None
+        return self.tokens.claims
+
+    def _coalesced(self, endpoint, fetch, **params):
+        return self.flights.do(request_key(endpoint, self.campus, **params), fetch)
 
     def marks(self):
-        return get_marks(self.token, self.campus) if self.token else None
+        if not self.token:
+            return None
+        return self._coalesced('marks', lambda: get_marks(self.token, self.campus, self.session, self.cache))
 
     def average_mark(self):
-        return calc_avr_mark(self.token, self.campus) if self.token else None
+        return average_of_marks(self.marks()) if self.token else None
+
+    def homework(self, status=3, limit=1000, sort='-hw.time', page=None):
+        if not self.token:
+            return None
+        return self._coalesced(
+            'homework',
+            lambda: get_homework(self.token, self.campus, status, limit, sort, self.session, self.cache, page),
+            status=status, limit=limit, sort=sort, page=page
+        )
 
-    def homework(self, status=3, limit=1000, sort='-hw.time'):
-        return get_homework(self.token, self.campus, status, limit, sort) if self.token else None
+    def iter_homework_pages(self, status=3, page_size=50, sort='-hw.time'):
+        # ленивый генератор: следующая страница запрашивается, только когда до нее дошли
+        first_ids = set()
+        yielded = 0
+        page = 1
+        while self.token:
+            data = self.homework(status, page_size, sort, page)
+            if data is None:
+                # ошибка запроса: оборванный список не должен сойти за полный
+                raise RequestError("Не удалось загрузить список заданий")
+            records = data.get('data', []) if isinstance(data, dict) else []
+            if not records:
+                return
+            first_id = records[0].get('id') if isinstance(records[0], dict) else None
+            if first_id is not None:
+                if first_id in first_ids:
+                    # сервер вернул ту же страницу - параметр page не поддерживается:
+                    # остаток списка берется одним запросом, иначе он оборвался бы на первой странице
+                    data = self.homework(status, sort=sort)
+                    if data is None:
+                        raise RequestError("Не удалось загрузить список заданий")
+                    rest = data.get('data', [])[yielded:] if isinstance(data, dict) else []
+                    if rest:
+                        yield rest
+                    return
+                first_ids.add(first_id)
+            yield records
+            yielded += len(records)
+            if len(records) < page_size:
+                return
+            page += 1
+
+    def iter_homework(self, status=3, page_size=50, sort='-hw.time'):
+        for records in self.iter_homework_pages(status, page_size, sort):
+            yield from records
 
     def attendance(self, period="month"):
-        return get_attendance(self.token, self.campus, period) if self.token else None
+        if not self.token:
+            return None
+        return self._coalesced(
+            'attendance',
+            lambda: get_attendance(self.token, self.campus, period, self.session, self.cache),
+            period=period
+        )
 
     def leaderboard(self):
-        return get_leaderboard(self.token, self.campus) if self.token else None
+        if not self.token:
+            return None
+        return self._coalesced('leaderboard', lambda: get_leaderboard(self.token, self.campus, self.session, self.cache))
 
     def schedule(self, week=True, date=None):
-        return get_schedule(self.token, week, date, self.campus) if self.token else None
+        if not self.token:
+            return None
+        return self._coalesced(
+            'schedule',
+            lambda: get_schedule(self.token, week, date, self.campus, self.session, self.cache),
+            week=week, date=date
+        )
+
+    def gather_all(self, timeouts=None, datasets=None):
+        # наборы дашборда параллельно; набор, не уложившийся в свой таймаут, пропускается
+        timeouts = dict(GATHER_TIMEOUTS, **(timeouts or {}))
+        fetchers = {
+            'grades': self.marks,
+            'leaderboard': self.leaderboard,
+            'homework': self.homework,
+            'schedule': self.schedule,
+            'attendance': self.attendance,
+        }
+        started = time.monotonic()
+        futures = {name: self._gather_pool.submit(fetch) for name, fetch in fetchers.items()
+                   if datasets is None or name in datasets}
+        
+        data = {}
+        for name, future in futures.items():
+            try:
+                result = future.result(max(timeouts[name] - (time.monotonic() - started), 0))
+            except FutureTimeout:
+                print(f"Превышено время ожидания ({timeouts[name]} с): {name}")
+            except Exception as e:
+                print(f"Ошибка загрузки {name}: {e}")
+            else:
+                if result:
+                    data[name] = result
+        return data
+
+    def coalescing_stats(self):
+        return self.flights.stats()
+
+    def cache_stats(self):
+        return self.cache.stats()
+
+    def upload_stats(self):
+        return self.uploads.stats()
 
-    def download_homework_file(self, file_url, save_path):
-        return download_file(file_url, save_path, self.token) if self.token else (False, "Нет токена авторизации")
+    def circuit_stats(self):
+        return circuit_stats()
+
+    def download_homework_file(self, file_url, save_path, progress_callback=None, cancelled=None):
+        if not self.token:
+            return False, "Нет токена авторизации"
+        return download_file(file_url, save_path, self.token, self.session,
+                             progress_callback=progress_callback, cancelled=cancelled)
+    
+    def mirror_attachments(self, dest_dir, concurrency=4, statuses=(3,), progress_callback=None, cancelled=None):
+        # все вложения заданий с указанными статусами в dest_dir: не больше concurrency скачиваний сразу,
+        # неизменившиеся пропускаются; progress_callback(обработано, всего) - по одному вызову на файл
+        if not self.token:
+            return False, "Нет токена авторизации"
+        if isinstance(statuses, int):
+            statuses = (statuses,)
+        
+        mirror = AttachmentMirror(dest_dir)
+        attachments = {}
+        try:
+            for status in statuses:
+                for homework in self.iter_homework(status):
+                    file_url = homework.get('file_path') if isinstance(homework, dict) else None
+                    if file_url and file_url not in attachments:
+                        attachments[file_url] = homework
+        except RequestError as e:
+            return False, e
+        
+        def mirror_one(file_url, homework):
+            if cancelled and cancelled():
+                return 'cancelled'
+            # HEAD без тела: ETag и размер сравниваются с манифестом
+            probe = _probe_download(file_url, self.token, self.session)
+            size, _, etag = probe
+            if mirror.is_current(file_url, size, etag):
+                return 'unchanged'
+            
+            temp_path = mirror.temp_path(file_url)
+            success, message = download_file(file_url, temp_path, self.token, self.session,
+                                             segments=1, cancelled=cancelled, probe=probe)
+            if not success:
+                if cancelled and cancelled():
+                    return 'cancelled'
+                print(f"Не удалось скачать {file_url}: {message}")
+                return 'failed'
+            mirror.add(file_url, temp_path, etag, homework_id=homework.get('id'),
+                       theme=homework.get('theme'), subject=homework.get('name_spec'))
+            return 'downloaded'
+        
+        stats = {'total': len(attachments), 'downloaded': 0, 'unchanged': 0, 'failed': 0, 'cancelled': 0}
+        with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+            futures = [pool.submit(mirror_one, file_url, homework) for file_url, homework in attachments.items()]
+            for done, future in enumerate(as_completed(futures), 1):
+                try:
+                    stats[future.result()] += 1
+                except Exception as e:
+                    print(f"Ошибка сохранения вложения: {e}")
+                    stats['failed'] += 1
+                if progress_callback:
+                    progress_callback(done, len(futures))
+        
+        mirror.save_manifest()
+        return True, stats
     
     def check_token_validity(self):
         if not self.token:
             return False, "Нет токена авторизации"
         
-        return check_token_validity(self.token, self.campus)
+        return self.tokens.check()
     
-    def get_file_token(self):
+    def get_file_token(self, deadline=None):
         if not self.token:
             return False, "Нет токена авторизации"
         
-        print(f"Основной токен для запроса create-token: {self.token}")
-        return get_file_token(self.token, self.campus)
+        is_valid, message = self.tokens.check()
+        if not is_valid:
+            return False, message
+        
+        return self.file_tokens.get(deadline)
     
-    def upload_file_to_storage(self, file_path, file_token, homework_dir_id):
-        return upload_file_to_storage(file_path, file_token, homework_dir_id)
+    def upload_file_to_storage(self, file_path, file_token, homework_dir_id, progress_callback=None, cancelled=None,
+                               deadline=None):
+        return upload_file_to_storage(file_path, file_token, homework_dir_id, self.session,
+                                      progress_callback, cancelled, deadline)
     
-    def submit_homework(self, homework_id, file_url=None, answer_text=None):
-        return submit_homework(self.token, self.campus, homework_id, file_url, answer_text) if self.token else (False, "Нет токена авторизации")
+    def upload_homework_file(self, file_path, progress_callback=None, cancelled=None, sha256=None, deadline=None):
+        # загрузка с закэшированным file-token; 401 хранилища - токен сбрасывается, одна повторная попытка
+        try:
+            size = os.path.getsize(file_path)
+            sha256 = sha256 or file_sha256(file_path)
+        except OSError as e:
+            return False, f"Не удалось прочитать файл: {str(e)}"
+        
+        for attempt in range(2):
+            success, token_data = self.get_file_token(deadline)
+            if not success:
+                return False, keep_status(f"Не удалось получить create-token: {token_data}", token_data)
+            
+            link = self.uploads.lookup(sha256, token_data['homework_dir_id'], size)
+            if link:
+                print(f"Файл уже загружен, используется ссылка: {link}")
+                if progress_callback:
+                    progress_callback(size, size, 0.0)
+                return True, link
+            
+            success, result = self.upload_file_to_storage(file_path, token_data['token'], token_data['homework_dir_id'],
+                                                          progress_callback, cancelled, deadline)
+            if result != STORAGE_UNAUTHORIZED:
+                break
+            self.file_tokens.invalidate()
+        
+        if success:
+            self.uploads.store(sha256, token_data['homework_dir_id'], size, result)
+        return success, result
+    
+    def submit_homework(self, homework_id, file_url=None, answer_text=None, idempotency_key=None, deadline=None):
+        if not self.token:
+            return False, "Нет токена авторизации"
+        
+        result = submit_homework(self.token, self.campus, homework_id, file_url, answer_text, self.session,
+                                 idempotency_key, deadline)
+        self.flights.forget('homework')
+        self.cache.invalidate('homework')
+        if result[0]:
+            self.submitted_count += 1
+        return result
+    
+    def submit_pipeline(self, homework_id, file_path=None, answer_text=None, progress_callback=None, cancelled=None,
+                        timeout=SUBMIT_TIMEOUT, idempotency_key=None):
+        # токен проверяется один раз; file-token запрашивается, пока файл читается и хэшируется;
+        # timeout - общий срок всех шагов, каждый запрос получает не больше оставшегося времени;
+        # idempotency_key - один на все попытки одной отправки (очередь outbox)
+        timings = {}
+        self.submission_timings = timings
+        started = time.monotonic()
+        deadline = Deadline(timeout) if timeout else None
+        try:
+            return self._submit_pipeline(homework_id, file_path, answer_text, progress_callback, cancelled,
+                                         timings, deadline, idempotency_key)
+        except requests.RequestException as e:
+            # таймаут, истекший общий срок или разомкнутая цепь
+            return False, RequestError(f"Ошибка соединения: {str(e)}")
+        finally:
+            timings['total'] = time.monotonic() - started
+            print("Этапы отправки: " + ", ".join(f"{stage} {seconds:.3f} с" for stage, seconds in timings.items()))
     
+    def _submit_pipeline(self, homework_id, file_path, answer_text, progress_callback, cancelled, timings, deadline,
+                         idempotency_key):
+        def timed(stage, func, *args, **kwargs):
+            stage_started = time.monotonic()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                timings[stage] = time.monotonic() - stage_started
+        
+        if not self.token:
+            return False, "Нет токена авторизации"
+        
+        is_valid, message = timed('validate', self.tokens.check)
+        if not is_valid:
+            return False, keep_status(f"Токен недействителен: {message}", message)
+        
+        file_url = None
+        if file_path:
+            with ThreadPoolExecutor(max_workers=1) as pool:
+                # токен уже проверен - file-token берется из кэша или запрашивается без повторной проверки
+                token_request = pool.submit(timed, 'file_token', self.file_tokens.get, deadline)
+                try:
+                    digest = timed('prepare', file_sha256, file_path)
+                    print(f"Файл подготовлен: {os.path.basename(file_path)}, sha256 {digest}")
+                except OSError as e:
+                    return False, f"Не удалось прочитать файл: {str(e)}"
+                success, token_data = token_request.result()
+            if not success:
+                return False, keep_status(f"Не удалось получить create-token: {token_data}", token_data)
+            
+            success, result = timed('upload', self.upload_homework_file, file_path, progress_callback, cancelled,
+                                    digest, deadline)
+            if not success:
+                return False, keep_status(f"Не удалось загрузить файл: {result}", result)
+            file_url = result
+        
+        if cancelled and cancelled():
+            return False, "Загрузка отменена"
+        
+        return timed('submit', self.submit_homework, homework_id, file_url, answer_text, idempotency_key, deadline)
@@ -0,0 +1,236 @@
+# очередь отправки заданий в SQLite: задание ставится в очередь сразу,
+# отправляет его client.submit_pipeline, при ошибках - повтор с экспоненциальной паузой в фоновом потоке
+
+import os
+import random
+import threading
+import time
+import uuid
+
+from core import SessionLocal, is_transient
+from models import OutboxSubmission
+
+# пауза перед повтором: BASE_DELAY * 2^(попытка - 1), не больше MAX_DELAY; после MAX_ATTEMPTS - failed
+BASE_DELAY = 5
+MAX_DELAY = 15 * 60
+MAX_ATTEMPTS = 12
+# запись берется в работу на LEASE секунд - упавший процесс не держит ее навсегда;
+# дольше общего срока отправки (SUBMIT_TIMEOUT), чтобы идущую загрузку не взял второй поток
+LEASE = 35 * 60
+# как часто поток просыпается сам, даже если его не будили
+POLL_INTERVAL = 60
+# запись с ответом 401 ждет перелогина (wake), попытка не засчитывается; это запасной срок
+AUTH_WAIT = MAX_DELAY
+
+def backoff_delay(attempts):
+    delay = min(BASE_DELAY * 2 ** max(attempts - 1, 0), MAX_DELAY)
+    # разброс, чтобы несколько клиентов после сбоя не стучались одновременно
+    return delay * random.uniform(0.5, 1.0)
+
+def _as_dict(item):
+    return {
+        'id': item.id,
+        'homework_id': item.homework_id,
+        'idempotency_key': item.idempotency_key,
+        'file_path': item.file_path,
+        'answer_text': item.answer_text,
+        'status': item.status,
+        'attempts': item.attempts,
+        'next_attempt_at': item.next_attempt_at,
+        'last_error': item.last_error,
+    }
+
+class SubmissionOutbox:
+    def __init__(self, client, on_change=None):
+        # on_change(item) вызывается из фонового потока, когда задание отправлено или отклонено
+        self.client = client
+        self.login = client.login
+        self.on_change = on_change
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def enqueue(self, homework_id, file_path=None, answer_text=None, claim=False):
+        # одна запись на задание: повторная отправка заменяет ожидающую и получает новый ключ;
+        # claim=True - запись сразу взята вызывающим для process(), фоновый поток ее не трогает
+        db = SessionLocal()
+        try:
+            item = db.query(OutboxSubmission).filter_by(login=self.login, homework_id=str(homework_id)).first()
+            if item is None:
+                item = OutboxSubmission(login=self.login, homework_id=str(homework_id))
+                db.add(item)
+            item.idempotency_key = uuid.uuid4().hex
+            item.file_path = file_path
+            item.answer_text = answer_text
+            item.status = 'pending'
+            item.attempts = 0
+            item.next_attempt_at = time.time() + LEASE if claim else time.time()
+            item.last_error = None
+            db.commit()
+            result = _as_dict(item)
+        finally:
+            db.close()
+        if not claim:
+            self._wake.set()
+        return result
+
+    def pending(self):
+        db = SessionLocal()
+        try:
+            query = db.query(OutboxSubmission).filter_by(login=self.login, status='pending')
+            return [_as_dict(item) for item in query.order_by(OutboxSubmission.id)]
+        finally:
+            db.close()
+
+    def _claim(self):
+        # берет одну готовую к отправке запись; UPDATE с условием - второй процесс ту же запись не получит
+        db = SessionLocal()
+        try:
+            now = time.time()
+            candidates = db.query(OutboxSubmission.id).filter(
+                OutboxSubmission.login == self.login,
+                OutboxSubmission.status == 'pending',
+                OutboxSubmission.next_attempt_at <= now
+            ).order_by(OutboxSubmission.next_attempt_at)
+            for (item_id,) in candidates.all():
+                claimed = db.query(OutboxSubmission).filter(
+                    OutboxSubmission.id == item_id,
+                    OutboxSubmission.status == 'pending',
+                    OutboxSubmission.next_attempt_at <= now
+                ).update({'next_attempt_at': now + LEASE}, synchronize_session=False)
+                db.commit()
+                if claimed:
+                    return _as_dict(db.get(OutboxSubmission, item_id))
+            return None
+        finally:
+            db.close()
+
+    def _update(self, item, **values):
+        # запись меняется, только если ее ключ тот же: повторная отправка (enqueue) выдает новый ключ,
+        # и результат прежней попытки отбрасывается - новая запись остается pending; тогда возвращает None
+        db = SessionLocal()
+        try:
+            updated = db.query(OutboxSubmission).filter(
+                OutboxSubmission.id == item['id'],
+                OutboxSubmission.idempotency_key == item['idempotency_key']
+            ).update(values, synchronize_session=False)
+            db.commit()
+            if not updated:
+                return None
+            return _as_dict(db.get(OutboxSubmission, item['id']))
+        finally:
+            db.close()
+
+    def process(self, item, progress_callback=None, cancelled=None, detached=None):
+        # первая попытка сразу, в потоке вызывающего: окно задания показывает прогресс загрузки и может ее отменить;
+        # запись должна быть взята через enqueue(..., claim=True); возвращает (success, message)
+        # итог уходит и в on_change, как из drain: отправленное - всегда, отклоненное - если окно уже закрыто
+        # (detached() -> True) и показать ошибку некому
+        try:
+            result = self._process(item, progress_callback, cancelled)
+        except Exception as e:
+            result = self._retry(item, str(e))
+        if result is None:
+            return False, "Задание отправлено повторно, эта попытка отменена"
+        closed = detached is not None and detached()
+        if self.on_change and (result['status'] == 'sent' or result['status'] == 'failed' and closed):
+            self.on_change(result)
+        if result['status'] == 'sent':
+            return True, "Задание успешно отправлено на проверку"
+        if result['status'] == 'pending':
+            self._wake.set()
+            return False, f"{result['last_error']}\nЗадание осталось в очереди и будет отправлено автоматически"
+        return False, result['last_error']
+
+    def _process(self, item, progress_callback=None, cancelled=None):
+        if item['file_path'] and not os.path.exists(item['file_path']):
+            return self._update(item, status='failed', last_error=f"Файл не найден: {item['file_path']}")
+
+        # повторная попытка не грузит файл заново - ссылку по sha256 вернет индекс загрузок клиента
+        success, message = self.client.submit_pipeline(
+            item['homework_id'], item['file_path'], item['answer_text'], progress_callback, cancelled,
+            idempotency_key=item['idempotency_key'])
+        if not success:
+            if cancelled and cancelled():
+                return self._update(item, status='cancelled', last_error=message)
+            return self._failed(item, message)
+        return self._update(item, status='sent', last_error=None)
+
+    def _failed(self, item, error):
+        # по HTTP-статусу ошибки (core.RequestError): повтор, ожидание нового токена или сразу failed
+        if getattr(error, 'status', None) == 401:
+            print(f"Отправка задания {item['homework_id']} ждет нового входа: {error}")
+            return self._update(item, last_error=str(error), next_attempt_at=time.time() + AUTH_WAIT)
+        if is_transient(error):
+            return self._retry(item, str(error))
+        return self._update(item, status='failed', attempts=item['attempts'] + 1, last_error=str(error))
+
+    def _retry(self, item, error):
+        attempts = item['attempts'] + 1
+        if attempts >= MAX_ATTEMPTS:
+            return self._update(item, status='failed', attempts=attempts, last_error=error)
+        print(f"Отправка задания {item['homework_id']} не удалась ({error}), попытка {attempts}")
+        return self._update(item, attempts=attempts, last_error=error,
+                            next_attempt_at=time.time() + backoff_delay(attempts))
+
+    def drain(self):
+        # обрабатывает все записи, чей срок подошел; возвращает число отправленных
+        sent = 0
+        while not self._stop.is_set():
+            item = self._claim()
+            if item is None:
+                break
+            try:
+                result = self._process(item)
+            except Exception as e:
+                result = self._retry(item, str(e))
+            if result is None:
+                # запись заменена новой отправкой, ею займется следующий проход
+                continue
+            if result['status'] == 'sent':
+                sent += 1
+            if result['status'] != 'pending' and self.on_change:
+                self.on_change(result)
+        return sent
+
+    def _next_due(self):
+        db = SessionLocal()
+        try:
+            item = db.query(OutboxSubmission.next_attempt_at).filter_by(
+                login=self.login, status='pending').order_by(OutboxSubmission.next_attempt_at).first()
+            return item[0] if item else None
+        finally:
+            db.close()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.drain()
+                next_due = self._next_due()
+            except Exception as e:
+                print(f"Ошибка очереди отправки: {e}")
+                next_due = None
+            timeout = POLL_INTERVAL if next_due is None else min(max(next_due - time.time(), 0), POLL_INTERVAL)
+            self._wake.wait(timeout)
+            self._wake.clear()
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def wake(self):
+        # например, после восстановления сети - не ждать конца паузы
+        db = SessionLocal()
+        try:
+            db.query(OutboxSubmission).filter_by(login=self.login, status='pending').update(
+                {'next_attempt_at': time.time()}, synchronize_session=False)
+            db.commit()
+        finally:
+            db.close()
+        self._wake.set()
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
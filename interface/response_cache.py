@@ -0,0 +1,111 @@
+# кэш ответов API в памяти: TTL по эндпоинтам, вытеснение LRU по размеру в байтах
+
+import threading
+import time
+from collections import OrderedDict
+
+# сколько секунд ответ каждого эндпоинта считается свежим
+DEFAULT_TTLS = {
+    'marks': 300,
+    'homework': 120,
+    'leaderboard': 600,
+    'attendance': 600,
+    'schedule': 900,
+}
+DEFAULT_TTL = 60
+MAX_BYTES = 8 * 1024 * 1024
+
+class CacheEntry:
+    __slots__ = ('data', 'size', 'etag', 'last_modified', 'expires_at')
+
+    def __init__(self, data, size, etag, last_modified, expires_at):
+        self.data = data
+        self.size = size
+        self.etag = etag
+        self.last_modified = last_modified
+        self.expires_at = expires_at
+
+    def is_fresh(self):
+        return time.monotonic() < self.expires_at
+
+    def validators(self):
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+class ResponseCache:
+    def __init__(self, max_bytes=MAX_BYTES, ttls=None):
+        self.max_bytes = max_bytes
+        self.ttls = dict(DEFAULT_TTLS, **(ttls or {}))
+        self.size = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self.revalidations = 0
+        self.evictions = 0
+
+    def ttl(self, endpoint):
+        return self.ttls.get(endpoint, DEFAULT_TTL)
+
+    def lookup(self, key):
+        # key = (endpoint, url, params); устаревшая запись тоже возвращается - для ревалидации
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            if entry.is_fresh():
+                self.hits += 1
+            else:
+                self.stale += 1
+            return entry
+
+    def store(self, key, data, size, etag=None, last_modified=None):
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.size -= old.size
+            if size > self.max_bytes:
+                return
+
+            expires_at = time.monotonic() + self.ttl(key[0])
+            self._entries[key] = CacheEntry(data, size, etag, last_modified, expires_at)
+            self.size += size
+
+            while self.size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.size -= evicted.size
+                self.evictions += 1
+
+    def revalidated(self, key):
+        # сервер ответил 304: данные те же, продлеваем срок жизни
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry.expires_at = time.monotonic() + self.ttl(key[0])
+                self.revalidations += 1
+
+    def invalidate(self, endpoint=None):
+        with self._lock:
+            for key in list(self._entries):
+                if endpoint is None or key[0] == endpoint:
+                    self.size -= self._entries.pop(key).size
+
+    def stats(self):
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'stale': self.stale,
+                'revalidations': self.revalidations,
+                'evictions': self.evictions,
+                'entries': len(self._entries),
+                'bytes': self.size,
+                'max_bytes': self.max_bytes,
+            }
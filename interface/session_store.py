@@ -0,0 +1,86 @@
+# сохраненная сессия: последний токен в БД (зашифрован), вход без запроса к API
+
+import os
+import time
+
+from cryptography.fernet import Fernet, InvalidToken
+
+from core import SessionLocal
+from models import StoredSession, User
+from interface.mystat_interface import MystatInterface
+
+KEY_FILE = os.environ.get("MYSTAT_KEY_FILE", "mystat.key")
+
+def _fernet():
+    key = os.environ.get("MYSTAT_SECRET_KEY")
+    if not key:
+        if not os.path.exists(KEY_FILE):
+            fd = os.open(KEY_FILE, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+            with os.fdopen(fd, 'wb') as file:
+                file.write(Fernet.generate_key())
+        with open(KEY_FILE, 'rb') as file:
+            key = file.read().strip()
+    return Fernet(key)
+
+def save_session(login, token, expires_at):
+    db = SessionLocal()
+    try:
+        encrypted = _fernet().encrypt(token.encode()).decode()
+        stored = db.query(StoredSession).filter_by(login=login).first()
+        if stored:
+            stored.token = encrypted
+            stored.expires_at = int(expires_at)
+        else:
+            db.add(StoredSession(login=login, token=encrypted, expires_at=int(expires_at)))
+        db.commit()
+    finally:
+        db.close()
+
+def load_session():
+    db = SessionLocal()
+    try:
+        stored = db.query(StoredSession).order_by(StoredSession.updated_at.desc()).first()
+        if not stored:
+            return None
+        try:
+            token = _fernet().decrypt(stored.token.encode()).decode()
+        except InvalidToken:
+            print("Сохраненная сессия не расшифрована, нужен вход")
+            return None
+        return stored.login, token, stored.expires_at
+    finally:
+        db.close()
+
+def clear_session(login=None):
+    db = SessionLocal()
+    try:
+        query = db.query(StoredSession)
+        if login:
+            query = query.filter_by(login=login)
+        query.delete()
+        db.commit()
+    finally:
+        db.close()
+
+def restore_client():
+    session = load_session()
+    if not session:
+        return None
+
+    login, token, expires_at = session
+    db = SessionLocal()
+    try:
+        user = db.query(User).filter_by(login=login).first()
+        password = user.password if user else None
+    finally:
+        db.close()
+
+    client = MystatInterface(login, password)
+    client.token = token
+    is_valid, message = client.tokens.local_check() or (False, "Срок действия неизвестен")
+    if not is_valid or expires_at <= time.time():
+        print(f"Сохраненная сессия не подходит: {message}")
+        client.close()
+        clear_session(login)
+        return None
+    return client
@@ -0,0 +1,101 @@
+# объединение одинаковых запросов (single-flight): один запрос к API на всех ожидающих
+
+import threading
+import time
+
+def request_key(endpoint, campus, **params):
+    return (endpoint, campus, tuple(sorted(params.items())))
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.finished_at = None
+
+class SingleFlight:
+    def __init__(self, linger=5.0):
+        # linger - сколько секунд готовый результат отдается повторным вызовам подряд
+        self.linger = linger
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.calls = 0
+        self.upstream = 0
+        self.coalesced = 0
+
+    def _recent(self, key):
+        call = self._calls.get(key)
+        if call is None:
+            return None
+        if call.finished_at is not None and time.monotonic() - call.finished_at > self.linger:
+            del self._calls[key]
+            return None
+        return call
+
+    def do(self, key, fn):
+        with self._lock:
+            self.calls += 1
+            call = self._recent(key)
+            if call is not None:
+                self.coalesced += 1
+                leader = False
+            else:
+                call = self._calls[key] = _Call()
+                self.upstream += 1
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                # ошибки и пустые ответы не переиспользуются после завершения
+                if call.error is not None or call.result is None:
+                    if self._calls.get(key) is call:
+                        del self._calls[key]
+                else:
+                    call.finished_at = time.monotonic()
+            call.done.set()
+        return call.result
+
+    def peek(self, key):
+        with self._lock:
+            call = self._recent(key)
+            if call is None or not call.done.is_set():
+                return False, None
+            self.calls += 1
+            self.coalesced += 1
+            return True, call.result
+
+    def publish(self, key, result):
+        if result is None:
+            return
+        with self._lock:
+            self.calls += 1
+            self.upstream += 1
+            call = self._calls[key] = _Call()
+            call.result = result
+            call.finished_at = time.monotonic()
+            call.done.set()
+
+    def forget(self, endpoint=None):
+        with self._lock:
+            for key in list(self._calls):
+                if endpoint is None or key[0] == endpoint:
+                    del self._calls[key]
+
+    def stats(self):
+        with self._lock:
+            return {
+                'calls': self.calls,
+                'upstream': self.upstream,
+                'coalesced': self.coalesced,
+            }
@@ -0,0 +1,343 @@
+# локальное хранилище (offline-first): ответы API пишутся в таблицы models.py,
+# виджеты сначала рисуются из БД, затем данные сверяются с API в фоне
+
+import hashlib
+import json
+import time
+
+from sqlalchemy import or_
+from sqlalchemy.dialects import postgresql, sqlite
+
+from core import SessionLocal, engine
+from models import Mark, Attendance, Homework, Schedule, SyncState
+
+# наборы данных хранилища - ключи те же, что у данных дашборда
+DATASETS = ('grades', 'homework', 'attendance', 'schedule')
+HOMEWORK_STATUS = 3
+# инкрементальная синхронизация заданий: размер страницы и как часто все же качать весь список
+HOMEWORK_PAGE_SIZE = 20
+HOMEWORK_MAX_PAGES = 50
+FULL_SYNC_INTERVAL = 6 * 60 * 60
+
+def _record_id(record, repeats):
+    # у записей без id ключ - хэш всей записи: изменилась запись - новая строка, старая удалится сверкой;
+    # одинаковые записи (две равные оценки за день) различаются номером повтора в repeats
+    if record.get('id') is not None:
+        return str(record['id'])
+    raw = json.dumps(record, sort_keys=True, ensure_ascii=False).encode()
+    digest = hashlib.sha1(raw).hexdigest()
+    repeats[digest] = repeats.get(digest, 0) + 1
+    return digest if repeats[digest] == 1 else f'{digest}:{repeats[digest]}'
+
+def _payload(record):
+    return json.dumps(record, ensure_ascii=False)
+
+def _mark_value(record):
+    try:
+        return float(record.get('mark'))
+    except (TypeError, ValueError):
+        return None
+
+def mark_rows(marks_data):
+    rows = []
+    repeats = {}
+    for position, mark in enumerate(marks_data or []):
+        if isinstance(mark, dict):
+            rows.append({
+                'upstream_id': _record_id(mark, repeats),
+                'position': position,
+                'date': str(mark.get('mark_date', '')),
+                'subject': str(mark.get('name_spec', '')),
+                'value': _mark_value(mark),
+                'teacher': str(mark.get('fio_teach', '')),
+                'payload': _payload(mark),
+            })
+    return rows
+
+def homework_rows(homework_data, status=HOMEWORK_STATUS):
+    rows = []
+    repeats = {}
+    if isinstance(homework_data, dict):
+        homework_data = homework_data.get('data', [])
+    for position, homework in enumerate(homework_data or []):
+        if isinstance(homework, dict):
+            rows.append({
+                'upstream_id': _record_id(homework, repeats),
+                'position': position,
+                'theme': str(homework.get('theme', '')),
+                'status': str(status),
+                'subject': homework.get('name_spec'),
+                'completion_time': homework.get('completion_time'),
+                'payload': _payload(homework),
+            })
+    return rows
+
+def attendance_rows(attendance_data):
+    rows = []
+    repeats = {}
+    if not isinstance(attendance_data, dict) or not isinstance(attendance_data.get('data'), dict):
+        return rows
+    for year, months in attendance_data['data'].items():
+        for month, days in months.items():
+            for day, info in days.items():
+                for visit in info.get('visits', []):
+                    rows.append({
+                        'upstream_id': _record_id(visit, repeats),
+                        'position': len(rows),
+                        'date': f"{year}-{month}-{day}",
+                        'status': str(visit.get('was', '-')),
+                        'subject': visit.get('spec', {}).get('name_spec', ''),
+                        'theme': visit.get('theme', ''),
+                        'payload': _payload(visit),
+                    })
+    return rows
+
+def schedule_rows(schedule_data):
+    rows = []
+    repeats = {}
+    for position, lesson in enumerate(schedule_data if isinstance(schedule_data, list) else []):
+        if isinstance(lesson, dict):
+            rows.append({
+                'upstream_id': _record_id(lesson, repeats),
+                'position': position,
+                'date': str(lesson.get('date', '')),
+                'subject': str(lesson.get('subject_name', '')),
+                'start_time': str(lesson.get('started_at', '')),
+                'end_time': str(lesson.get('finished_at', '')),
+                'teacher': str(lesson.get('teacher_name', '')),
+                'payload': _payload(lesson),
+            })
+    return rows
+
+def _insert(model):
+    dialect = postgresql if engine.dialect.name == 'postgresql' else sqlite
+    return dialect.insert(model)
+
+def _upsert(db, model, rows):
+    if not rows:
+        return
+    stmt = _insert(model)
+    columns = [name for name in rows[0] if name not in ('login', 'upstream_id')]
+    stmt = stmt.on_conflict_do_update(
+        index_elements=['login', 'upstream_id'],
+        set_={name: stmt.excluded[name] for name in columns}
+    )
+    db.execute(stmt, rows)
+
+def _delete(db, model, login, upstream_ids):
+    for start in range(0, len(upstream_ids), 500):
+        db.query(model).filter(
+            model.login == login,
+            model.upstream_id.in_(upstream_ids[start:start + 500])
+        ).delete(synchronize_session=False)
+
+class SyncEngine:
+    def __init__(self, login):
+        self.login = login
+        self.submitted_seen = 0
+
+    def _scope(self, db, model, dataset, rows, status):
+        query = db.query(model).filter(model.login == self.login)
+        if dataset == 'homework':
+            return query.filter(model.status == str(status))
+        if dataset in ('attendance', 'schedule'):
+            # сверяются только дни, пришедшие в ответе (период/неделя)
+            dates = {row['date'] for row in rows}
+            if dataset == 'schedule' and dates:
+                # даты ГГГГ-ММ-ДД сравниваются строками; недели раньше пришедшей уже прошли - удаляются
+                return query.filter(or_(model.date.in_(dates), model.date < min(dates)))
+            return query.filter(model.date.in_(dates))
+        return query
+
+    def save(self, dataset, data, status=HOMEWORK_STATUS):
+        model, rows = {
+            'grades': lambda: (Mark, mark_rows(data)),
+            'homework': lambda: (Homework, homework_rows(data, status)),
+            'attendance': lambda: (Attendance, attendance_rows(data)),
+            'schedule': lambda: (Schedule, schedule_rows(data)),
+        }[dataset]()
+        for row in rows:
+            row['login'] = self.login
+
+        db = SessionLocal()
+        try:
+            fetched = {row['upstream_id'] for row in rows}
+            stale = [upstream_id for (upstream_id,) in
+                     self._scope(db, model, dataset, rows, status).with_entities(model.upstream_id)
+                     if upstream_id not in fetched]
+            _delete(db, model, self.login, stale)
+            _upsert(db, model, rows)
+            db.commit()
+        finally:
+            db.close()
+
+    def _payloads(self, model, *criteria, order_by=()):
+        # order_by - столбцы сортировки до position (позиция в ответе API)
+        db = SessionLocal()
+        try:
+            query = db.query(model.payload).filter(model.login == self.login, *criteria)
+            return [json.loads(payload) for (payload,) in query.order_by(*order_by, model.position)]
+        finally:
+            db.close()
+
+    def load(self, dataset, status=HOMEWORK_STATUS):
+        if dataset == 'grades':
+            return self._payloads(Mark) or None
+        if dataset == 'homework':
+            records = self._payloads(Homework, Homework.status == str(status))
+            return {'data': records} if records else None
+        if dataset == 'schedule':
+            # позиции у каждой сохраненной недели начинаются с 0 - порядок задают дата и время начала
+            return self._payloads(Schedule, order_by=(Schedule.date, Schedule.start_time)) or None
+        if dataset == 'attendance':
+            return self._load_attendance()
+        raise KeyError(dataset)
+
+    def _load_attendance(self):
+        db = SessionLocal()
+        try:
+            query = db.query(Attendance.date, Attendance.payload).filter(Attendance.login == self.login)
+            data = {}
+            for date, payload in query.order_by(Attendance.position):
+                year, month, day = date.split('-')
+                day_info = data.setdefault(year, {}).setdefault(month, {}).setdefault(day, {'visits': []})
+                day_info['visits'].append(json.loads(payload))
+            return {'data': data} if data else None
+        finally:
+            db.close()
+
+    def load_all(self):
+        data = {}
+        for dataset in DATASETS:
+            local = self.load(dataset)
+            if local:
+                data[dataset] = local
+        return data
+
+    def save_all(self, data):
+        for dataset in DATASETS:
+            if data.get(dataset):
+                self.save(dataset, data[dataset])
+
+    def _get_state(self, key):
+        db = SessionLocal()
+        try:
+            state = db.query(SyncState).filter_by(login=self.login, key=key).first()
+            return state.value if state else None
+        finally:
+            db.close()
+
+    def _set_state(self, key, value):
+        db = SessionLocal()
+        try:
+            state = db.query(SyncState).filter_by(login=self.login, key=key).first()
+            if state:
+                state.value = None if value is None else str(value)
+            else:
+                db.add(SyncState(login=self.login, key=key, value=None if value is None else str(value)))
+            db.commit()
+        finally:
+            db.close()
+
+    def _stored_homework(self, status, upstream_ids):
+        # сохраненные payload и позиции только для записей пришедшей страницы, без разбора JSON
+        db = SessionLocal()
+        try:
+            query = db.query(Homework.upstream_id, Homework.payload, Homework.position).filter(
+                Homework.login == self.login, Homework.status == str(status),
+                Homework.upstream_id.in_(upstream_ids))
+            return {upstream_id: (payload, position) for upstream_id, payload, position in query}
+        finally:
+            db.close()
+
+    def save_homework(self, data, status=HOMEWORK_STATUS):
+        # полный список заданий: сохраняется вместе с hwm и временем полной синхронизации
+        self.save('homework', data, status)
+        rows = homework_rows(data, status)
+        self._set_state(f'homework:{status}:hwm', rows[0]['upstream_id'] if rows else None)
+        self._set_state(f'homework:{status}:full_at', time.time())
+
+    def _full_homework_sync(self, client, status):
+        data = client.homework(status)
+        if data is not None:
+            self.save_homework(data, status)
+
+    def sync_homework(self, client, status=HOMEWORK_STATUS, page_size=HOMEWORK_PAGE_SIZE):
+        # страницы от новых к старым до страницы с hwm - самой новой записью прошлой синхронизации;
+        # просмотренное окно сверяется целиком: изменившиеся записи обновляются, пропавшие удаляются
+        full_at = self._get_state(f'homework:{status}:full_at')
+        hwm = self._get_state(f'homework:{status}:hwm')
+        # после отправки задание уходит из середины списка - это видно только полной синхронизацией
+        submitted = client.submitted_count != self.submitted_seen
+        if full_at is None or hwm is None or submitted or time.time() - float(full_at) > FULL_SYNC_INTERVAL:
+            self.submitted_seen = client.submitted_count
+            self._full_homework_sync(client, status)
+            return self.load('homework', status)
+
+        window = []
+        stored = {}
+        seen = set()
+        repeats = {}
+        reached = False
+        for page in range(1, HOMEWORK_MAX_PAGES + 1):
+            data = client.homework(status, limit=page_size, page=page)
+            if data is None:
+                return self.load('homework', status)
+            records = [record for record in data.get('data', []) if isinstance(record, dict)]
+            upstream_ids = [_record_id(record, repeats) for record in records]
+            if seen.intersection(upstream_ids):
+                # страницы повторяются - сервер не понял page, нужна полная синхронизация
+                break
+            seen.update(upstream_ids)
+            window.extend(records)
+            stored.update(self._stored_homework(status, upstream_ids))
+            if hwm in upstream_ids:
+                reached = True
+                break
+            if len(records) < page_size:
+                break
+
+        if not reached or hwm not in stored:
+            self._full_homework_sync(client, status)
+            return self.load('homework', status)
+
+        rows = homework_rows(window, status)
+        # hwm остается на своей позиции, остальные записи окна выстраиваются вокруг нее
+        hwm_index = next(index for index, row in enumerate(rows) if row['upstream_id'] == hwm)
+        anchor = stored[hwm][1] - hwm_index
+        changed = []
+        for offset, row in enumerate(rows):
+            row['login'] = self.login
+            row['position'] = anchor + offset
+            if stored.get(row['upstream_id']) != (row['payload'], row['position']):
+                changed.append(row)
+        last_position = max(position for _, position in stored.values())
+
+        db = SessionLocal()
+        try:
+            # в окне нет записи, которая была в БД до его конца - задание сдано, снято или сменило статус
+            stale = [upstream_id for (upstream_id,) in db.query(Homework.upstream_id).filter(
+                Homework.login == self.login, Homework.status == str(status),
+                Homework.position <= last_position) if upstream_id not in seen]
+            _delete(db, Homework, self.login, stale)
+            _upsert(db, Homework, changed)
+            db.commit()
+        finally:
+            db.close()
+        self._set_state(f'homework:{status}:hwm', rows[0]['upstream_id'])
+        return self.load('homework', status)
+
+    def sync(self, client, homework=True):
+        # сверка с API: что пришло - сохраняется, чего нет (нет сети) - берется из БД;
+        # homework=False - задания уже грузятся постранично и сохраняются через save_homework
+        fetched = client.gather_all(datasets=('grades', 'leaderboard', 'schedule', 'attendance'))
+        try:
+            self.save_all(fetched)
+            records = self.sync_homework(client) if homework else None
+            if records:
+                fetched['homework'] = records
+        except Exception as e:
+            print(f"Ошибка сохранения данных в БД: {e}")
+        data = self.load_all()
+        data.update(fetched)
+        return data
@@ -0,0 +1,113 @@
+# срок действия JWT проверяется локально по claim "exp", без запроса к API
+
+import base64
+import json
+import threading
+import time
+
+from core import RequestError
+
+# запас на расхождение часов клиента и сервера, секунды
+CLOCK_SKEW = 60
+# сколько секунд держать file-token, если в нем нет claim "exp"
+FILE_TOKEN_TTL = 10 * 60
+
+def decode_token(token):
+    if not token:
+        return None
+    
+    try:
+        parts = token.split('.')
+        if len(parts) != 3:
+            return None
+            
+        payload = parts[1]
+        padding = len(payload) % 4
+        if padding:
+            payload += '=' * (4 - padding)
+            
+        decoded = base64.urlsafe_b64decode(payload)
+        user_data = json.loads(decoded)
+        
+        return user_data
+    except Exception as e:
+        print(f"Ошибка декодирования токена: {e}")
+        return None
+
+class TokenManager:
+    def __init__(self, token=None, probe=None, skew=CLOCK_SKEW):
+        # probe(token) -> (bool, str): сетевая проверка, если claims прочитать нельзя
+        self.probe = probe
+        self.skew = skew
+        self.set_token(token)
+
+    def set_token(self, token):
+        self.token = token
+        self.claims = decode_token(token)
+
+    def expires_at(self):
+        try:
+            return float(self.claims['exp'])
+        except (TypeError, KeyError, ValueError):
+            return None
+
+    def seconds_left(self):
+        expires_at = self.expires_at()
+        if expires_at is None:
+            return None
+        return expires_at - time.time()
+
+    def local_check(self):
+        # None - claims непригодны, нужна проверка по сети
+        if not self.token:
+            return False, RequestError("Нет токена авторизации", 401)
+        seconds_left = self.seconds_left()
+        if seconds_left is None:
+            return None
+        if seconds_left > self.skew:
+            return True, "Токен действителен"
+        # как ответ 401 от API: нужен новый вход, повтор с тем же токеном не поможет
+        return False, RequestError("Токен авторизации недействителен или истек", 401)
+
+    def check(self):
+        result = self.local_check()
+        if result is not None:
+            return result
+        if self.probe is None:
+            return False, "Не удалось проверить токен"
+        return self.probe(self.token)
+
+class FileTokenCache:
+    # file-token и homeworkDirId аккаунта: один запрос на все загрузки, пока токен не истек
+    def __init__(self, fetch, skew=CLOCK_SKEW, default_ttl=FILE_TOKEN_TTL):
+        # fetch(deadline) -> (bool, {'token': ..., 'homework_dir_id': ...} или текст ошибки)
+        self.fetch = fetch
+        self.skew = skew
+        self.default_ttl = default_ttl
+        self.requests = 0
+        self.hits = 0
+        self._data = None
+        self._expires_at = 0
+        self._lock = threading.Lock()
+
+    def get(self, deadline=None):
+        # под блокировкой: одновременные загрузки ждут один запрос, а не делают свои
+        with self._lock:
+            if self._data is not None and time.time() < self._expires_at - self.skew:
+                self.hits += 1
+                return True, dict(self._data)
+
+            self.requests += 1
+            success, data = self.fetch(deadline)
+            if success:
+                try:
+                    expires_at = float((decode_token(data['token']) or {})['exp'])
+                except (KeyError, TypeError, ValueError):
+                    expires_at = time.time() + self.default_ttl
+                self._data = dict(data)
+                self._expires_at = expires_at
+            return success, data
+
+    def invalidate(self):
+        with self._lock:
+            self._data = None
@@ -0,0 +1,62 @@
+# индекс загрузок: sha256 файла -> ссылка в хранилище; тот же файл в ту же директорию не грузится повторно
+
+import threading
+
+from core import SessionLocal
+from models import UploadedFile
+
+class UploadIndex:
+    def __init__(self, login):
+        self.login = login
+        self.hits = 0
+        self.misses = 0
+        self.bytes_saved = 0
+        self._lock = threading.Lock()
+
+    def lookup(self, sha256, homework_dir_id, size=0):
+        # ссылка годится только для той же директории - ее выдает действующий file-token
+        db = SessionLocal()
+        try:
+            uploaded = db.query(UploadedFile.link).filter_by(
+                login=self.login, sha256=sha256, homework_dir_id=str(homework_dir_id)).first()
+        except Exception as e:
+            print(f"Ошибка чтения индекса загрузок: {e}")
+            uploaded = None
+        finally:
+            db.close()
+
+        with self._lock:
+            if uploaded is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.bytes_saved += size
+        return uploaded[0]
+
+    def store(self, sha256, homework_dir_id, size, link):
+        db = SessionLocal()
+        try:
+            uploaded = db.query(UploadedFile).filter_by(
+                login=self.login, sha256=sha256, homework_dir_id=str(homework_dir_id)).first()
+            if uploaded:
+                uploaded.link = link
+                uploaded.size = size
+            else:
+                db.add(UploadedFile(login=self.login, sha256=sha256, homework_dir_id=str(homework_dir_id),
+                                    size=size, link=link))
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            print(f"Ошибка записи индекса загрузок: {e}")
+        finally:
+            db.close()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'bytes_saved': self.bytes_saved,
+            }
@@ -3,60 +3,44 @@
 import sys
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, 
                              QHBoxLayout, QLabel, QPushButton, QStackedWidget, 
-                             QFrame, QLineEdit, QMessageBox, QTableWidget, QTableWidgetItem,
-                             QCalendarWidget)
-from PyQt5.QtCore import Qt
+                             QFrame, QLineEdit, QMessageBox,
+                             QCalendarWidget, QCheckBox)
+from PyQt5.QtCore import Qt, QTimer, QThreadPool, pyqtSignal
 
 from core import SessionLocal
-from models import User
+from models import User, init_db
 from interface.mystat_interface import MystatInterface
+from interface.session_store import save_session, clear_session, restore_client
+from interface.sync_engine import SyncEngine
+from interface.outbox import SubmissionOutbox
 from widgets.grades_widget import GradesWidget
 from widgets.attendance_widget import AttendanceWidget
 from widgets.schedule_widget import ScheduleWidget
 from widgets.homework_widget import HomeworkWidget
 from widgets.calendar_widget import CalendarWidget
+from widgets.workers import run_in_background
+from widgets.data_table import DataTable
+from widgets.theme import apply_theme
+from widgets.deadlines import deadline_index
+
+# за сколько секунд до истечения токена перелогиниваться в фоне
+REAUTH_MARGIN = 300
+# сколько ждать фоновые задачи при выходе, мс
+SHUTDOWN_TIMEOUT = 5000
+# предварительная сборка неоткрытых вкладок, пока пользователь ничего не делает
+PREFETCH_TABS = False
+PREFETCH_DELAY = 3000
+# горизонт "скоро сдавать" в подсказке счетчика просроченных, дни
+UPCOMING_DAYS = 7
 
 class LoginWindow(QWidget):
     def __init__(self):
         super().__init__()
+        self.client = None
         self.setWindowTitle("MyStat - Вход")
-        self.setFixedSize(520, 450)
-        
-        self.setStyleSheet("""
-            QWidget { 
-                background-color: white;
-                color: #333; 
-                font-family: 'Segoe UI', Arial, sans-serif;
-            }
-            QLineEdit { 
-                background-color: white;
-                border: 2px solid #ddd;
-                border-radius: 8px;
-                padding: 12px 16px;
-                font-size: 14px;
-                color: #333;
-                min-height: 20px;
-            }
-            QLineEdit:focus {
-                border: 2px solid #6C59F5;
-                background-color: white;
-            }
-            QPushButton { 
-                background-color: #6C59F5;
-                color: white; 
-                border: none;
-                border-radius: 8px;
-                padding: 12px 24px; 
-                font-size: 14px;
-                font-weight: bold;
-            }
-            QPushButton:hover { 
-                background-color: #5A4AE8;
-            }
-            QPushButton:pressed {
-                background-color: #4A3BD1;
-            }
-        """)
+        self.setFixedSize(520, 500)
+        
+        self.setObjectName("login_window")
         
         self.init_ui()
         
@@ -67,12 +51,7 @@ class LoginWindow(QWidget):
         
         title = QLabel("MyStat")
         title.setAlignment(Qt.AlignCenter)
-        title.setStyleSheet("""
-            font-size: 32px; 
-            font-weight: bold; 
-            color: #2c3e50;
-            margin-bottom: 10px;
-        """)
+        title.setObjectName("login_title")
         layout.addWidget(title)
         
         self.login_input = QLineEdit()
@@ -85,26 +64,14 @@ class LoginWindow(QWidget):
         layout.addWidget(self.password_input)
         
         self.toggle_password_btn = QPushButton("👁 Показать пароль")
-        self.toggle_password_btn.setStyleSheet("""
-            QPushButton {
-                background-color: #f8f9fa;
-                border: 2px solid #ddd;
-                border-radius: 8px;
-                font-size: 14px;
-                color: #666;
-                padding: 8px 16px;
-            }
-            QPushButton:hover {
-                background-color: #e9ecef;
-                color: #333;
-            }
-            QPushButton:pressed {
-                background-color: #dee2e6;
-            }
-        """)
+        self.toggle_password_btn.setObjectName("toggle_password_btn")
         self.toggle_password_btn.clicked.connect(self.toggle_password_visibility)
         layout.addWidget(self.toggle_password_btn)
         
+        self.remember_checkbox = QCheckBox("Запомнить меня")
+        self.remember_checkbox.setObjectName("remember_checkbox")
+        layout.addWidget(self.remember_checkbox)
+        
         self.login_btn = QPushButton("Войти")
         self.login_btn.clicked.connect(self.login)
         layout.addWidget(self.login_btn)
@@ -127,15 +94,37 @@ class LoginWindow(QWidget):
             QMessageBox.warning(self, "Ошибка", "Введите логин и пароль")
             return
             
-        client = MystatInterface(login, password)
+        if self.client is not None:
+            return
         
-        if client.authenticate():
-            self.save_user_to_db(login, password)
+        # вход идет в пуле потоков - окно не замирает, пока сервер отвечает
+        self.client = MystatInterface(login, password)
+        self.login_btn.setEnabled(False)
+        self.login_btn.setText("Вход...")
+        run_in_background(self.client.authenticate, on_result=self.on_authenticated,
+                          on_error=lambda error: self.on_authenticated(False), owners=(self,))
+    
+    def on_authenticated(self, success):
+        client, self.client = self.client, None
+        self.login_btn.setEnabled(True)
+        self.login_btn.setText("Войти")
+        login = client.login
+        
+        if success:
+            self.save_user_to_db(login, client.password)
+            
+            remember = self.remember_checkbox.isChecked()
+            expires_at = client.tokens.expires_at()
+            if remember and expires_at is not None:
+                save_session(login, client.token, expires_at)
+            else:
+                clear_session(login)
             
-            self.main_window = MainWindow(client)
+            self.main_window = MainWindow(client, remember)
             self.main_window.show()
             self.close()
         else:
+            client.close()
             QMessageBox.critical(self, "Ошибка", "Неверный логин или пароль")
     
     def save_user_to_db(self, login, password):
@@ -157,29 +146,7 @@ class SidebarButton(QPushButton):
         self.setCheckable(True)
         self.setChecked(is_active)
         self.setFixedHeight(50)
-        
-        self.setStyleSheet("""
-            QPushButton { 
-                background-color: transparent; 
-                border: none; 
-                text-align: left; 
-                padding: 15px 20px; 
-                color: #ecf0f1; 
-                font-size: 15px;
-                font-weight: 600;
-                border-radius: 8px;
-                margin: 2px 0px;
-            }
-            QPushButton:hover { 
-                background-color: rgba(255, 255, 255, 0.15);
-                color: white;
-            }
-            QPushButton:checked { 
-                background: qlineargradient(x1:0, y1:0, x2:1, y2:0, 
-                    stop:0 #6C59F5, stop:1 #5A4AE8);
-                color: white;
-            }
-        """)
+        self.setProperty("sidebar", True)
 
 class CardWidget(QFrame):
     def __init__(self, title, content_widget=None, card_type="default"):
@@ -193,13 +160,7 @@ class CardWidget(QFrame):
         layout.setSpacing(15)
         
         title_label = QLabel(title)
-        title_label.setStyleSheet("""
-            font-size: 16px; 
-            font-weight: 700; 
-            color: #2c3e50;
-            padding: 0px;
-            margin-bottom: 5px;
-        """)
+        title_label.setObjectName("card_title")
         layout.addWidget(title_label)
         
         if content_widget:
@@ -208,30 +169,22 @@ class CardWidget(QFrame):
         self.setLayout(layout)
         
     def apply_card_style(self):
-        base_style = """
-            QFrame { 
-                background: qlineargradient(x1:0, y1:0, x2:0, y2:1, 
-                    stop:0 #ffffff, stop:1 #f8f9fa); 
-                border: 2px solid #e1e8ed; 
-                border-radius: 12px;
-            }
-        """
-        
-        if self.card_type == "stat":
-            hover_style = """
-                QFrame:hover {
-                    border: 2px solid #6C59F5;
-                }
-            """
-            self.setStyleSheet(base_style + hover_style)
-        else:
-            self.setStyleSheet(base_style)
+        self.setObjectName("card")
+        self.setProperty("card_type", self.card_type)
 
 class DashboardWidget(QWidget):
+    # обновление идет через синхронизацию главного окна: данные сохраняются в БД и доходят до всех вкладок
+    refresh_requested = pyqtSignal()
+    
     def __init__(self, client):
         super().__init__()
         self.client = client
+        # счетчики сроков читаются из общего индекса и обновляются вместе с ним, в том числе в полночь
+        self.deadlines = deadline_index()
         self.init_ui()
+        self.deadlines.changed.connect(self.update_deadline_counts)
+        self.deadlines.day_changed.connect(self.update_deadline_counts)
+        self.update_deadline_counts()
         
     def init_ui(self):
         layout = QVBoxLayout()
@@ -240,30 +193,12 @@ class DashboardWidget(QWidget):
         
         header_layout = QHBoxLayout()
         welcome_label = QLabel("Добро пожаловать в MyStat!")
-        welcome_label.setStyleSheet("""
-            font-size: 28px; 
-            font-weight: 700; 
-            color: #2c3e50;
-            padding: 10px 0px;
-        """)
+        welcome_label.setObjectName("welcome_label")
         header_layout.addWidget(welcome_label)
         header_layout.addStretch()
         
         refresh_btn = QPushButton("🔄 Обновить")
-        refresh_btn.setStyleSheet("""
-            QPushButton {
-                background-color: #6C59F5;
-                color: white;
-                border: none;
-                border-radius: 8px;
-                padding: 10px 20px;
-                font-weight: 600;
-                font-size: 14px;
-            }
-            QPushButton:hover {
-                background-color: #5A4AE8;
-            }
-        """)
+        refresh_btn.setObjectName("refresh_btn")
         refresh_btn.clicked.connect(self.refresh_data)
         header_layout.addWidget(refresh_btn)
         
@@ -277,10 +212,10 @@ class DashboardWidget(QWidget):
         self.avg_grade_label = QLabel("-")
         self.attendance_label = QLabel("-")
         
-        tasks_card = self.create_stat_card("Задания к выполнению", self.tasks_label, "#6C59F5")
-        overdue_card = self.create_stat_card("Просрочено", self.overdue_label, "#F75325")
-        avg_grade_card = self.create_stat_card("Средний балл", self.avg_grade_label, "#27ae60")
-        attendance_card = self.create_stat_card("Посещаемость", self.attendance_label, "#f39c12")
+        tasks_card = self.create_stat_card("Задания к выполнению", self.tasks_label, "primary")
+        overdue_card = self.create_stat_card("Просрочено", self.overdue_label, "danger")
+        avg_grade_card = self.create_stat_card("Средний балл", self.avg_grade_label, "success")
+        attendance_card = self.create_stat_card("Посещаемость", self.attendance_label, "warning")
         
         stats_layout.addWidget(tasks_card)
         stats_layout.addWidget(overdue_card)
@@ -322,26 +257,19 @@ class DashboardWidget(QWidget):
         layout.addLayout(content_layout)
         self.setLayout(layout)
         
-    def create_stat_card(self, title, value_label, color="#6C59F5"):
+    def create_stat_card(self, title, value_label, accent="primary"):
         card = CardWidget(title, card_type="stat")
         
         layout = QVBoxLayout()
         layout.setContentsMargins(20, 20, 20, 20)
         layout.setSpacing(15)
-        value_label.setStyleSheet(f"""
-            font-size: 48px; 
-            font-weight: 800; 
-            color: {color};
-        """)
+        value_label.setObjectName("stat_value")
+        value_label.setProperty("accent", accent)
         value_label.setAlignment(Qt.AlignCenter)
         layout.addWidget(value_label)
 
         subtitle = QLabel("за последний месяц")
-        subtitle.setStyleSheet("""
-            font-size: 12px; 
-            color: #7f8c8d;
-            font-weight: 500;
-        """)
+        subtitle.setObjectName("stat_subtitle")
         subtitle.setAlignment(Qt.AlignCenter)
         layout.addWidget(subtitle)
         
@@ -351,13 +279,7 @@ class DashboardWidget(QWidget):
     
     def create_calendar_card(self):
         card = QFrame()
-        card.setStyleSheet("""
-            QFrame { 
-                background: white; 
-                border: 1px solid #e1e8ed; 
-                border-radius: 8px;
-            }
-        """)
+        card.setObjectName("mini_calendar_card")
         
         layout = QVBoxLayout()
         layout.setContentsMargins(5, 3, 5, 5)
@@ -366,39 +288,7 @@ class DashboardWidget(QWidget):
         
         self.mini_calendar = QCalendarWidget()
         self.mini_calendar.setFixedHeight(280)
-        self.mini_calendar.setStyleSheet("""
-            QCalendarWidget {
-                background: white;
-                border: none;
-                border-radius: 6px;
-            }
-            QCalendarWidget QWidget#qt_calendar_navigationbar {
-                background: #3498db;
-                border-radius: 6px 6px 0px 0px;
-            }
-            QCalendarWidget QToolButton {
-                background: transparent;
-                color: white;
-                font-size: 11px;
-                padding: 4px;
-                border: none;
-            }
-            QCalendarWidget QSpinBox {
-                background: transparent;
-                color: white;
-                font-size: 12px;
-                border: none;
-            }
-            QCalendarWidget QAbstractItemView:item {
-                padding: 4px;
-                border: none;
-            }
-            QCalendarWidget QAbstractItemView:item:selected {
-                background: #3498db;
-                color: white;
-                border-radius: 3px;
-            }
-        """)
+        self.mini_calendar.setObjectName("mini_calendar")
         
         layout.addWidget(self.mini_calendar)
         card.setLayout(layout)
@@ -407,37 +297,9 @@ class DashboardWidget(QWidget):
     def create_grades_card(self):
         card = CardWidget("Последние оценки", card_type="default")
         
-        self.dashboard_grades_table = QTableWidget()
-        self.dashboard_grades_table.setColumnCount(3)
-        self.dashboard_grades_table.setHorizontalHeaderLabels(["Предмет", "Оценка", "Дата"])
-        self.dashboard_grades_table.setRowCount(0)
+        self.dashboard_grades_table = DataTable(["Предмет", "Оценка", "Дата"])
         self.dashboard_grades_table.setMaximumHeight(350)
-        self.dashboard_grades_table.setStyleSheet("""
-            QTableWidget {
-                background-color: white;
-                border: 1px solid #e1e8ed;
-                border-radius: 8px;
-                gridline-color: #ecf0f1;
-                selection-background-color: #3498db;
-            }
-            QTableWidget::item {
-                padding: 10px;
-                border-bottom: 1px solid #ecf0f1;
-                font-size: 13px;
-            }
-            QTableWidget::item:selected {
-                background-color: #6C59F5;
-                color: white;
-            }
-            QHeaderView::section {
-                background-color: #f8f9fa;
-                color: #2c3e50;
-                padding: 10px;
-                border: none;
-                font-weight: 600;
-                font-size: 13px;
-            }
-        """)
+        self.dashboard_grades_table.setObjectName("dashboard_table")
         
         card.layout().addWidget(self.dashboard_grades_table)
         return card
@@ -445,37 +307,9 @@ class DashboardWidget(QWidget):
     def create_schedule_dashboard_card(self):
         card = CardWidget("Ближайшие занятия", card_type="schedule")
         
-        self.dashboard_schedule_table = QTableWidget()
-        self.dashboard_schedule_table.setColumnCount(3)
-        self.dashboard_schedule_table.setHorizontalHeaderLabels(["Время", "Предмет", "Преподаватель"])
-        self.dashboard_schedule_table.setRowCount(0)
+        self.dashboard_schedule_table = DataTable(["Дата", "Время", "Предмет", "Преподаватель"])
         self.dashboard_schedule_table.setMaximumHeight(400)
-        self.dashboard_schedule_table.setStyleSheet("""
-            QTableWidget {
-                background-color: white;
-                border: 1px solid #e1e8ed;
-                border-radius: 8px;
-                gridline-color: #ecf0f1;
-                selection-background-color: #3498db;
-            }
-            QTableWidget::item {
-                padding: 10px;
-                border-bottom: 1px solid #ecf0f1;
-                font-size: 13px;
-            }
-            QTableWidget::item:selected {
-                background-color: #6C59F5;
-                color: white;
-            }
-            QHeaderView::section {
-                background-color: #f8f9fa;
-                color: #2c3e50;
-                padding: 10px;
-                border: none;
-                font-weight: 600;
-                font-size: 13px;
-            }
-        """)
+        self.dashboard_schedule_table.setObjectName("dashboard_table")
         
         card.layout().addWidget(self.dashboard_schedule_table)
         return card
@@ -484,37 +318,9 @@ class DashboardWidget(QWidget):
         card = CardWidget(title)
         card.setMaximumHeight(450)
         
-        table = QTableWidget()
-        table.setColumnCount(len(columns))
-        table.setHorizontalHeaderLabels(columns)
-        table.setRowCount(0)
+        table = DataTable(columns)
         table.setMaximumHeight(400)
-        table.setStyleSheet("""
-            QTableWidget {
-                background-color: white;
-                border: 1px solid #e1e8ed;
-                border-radius: 8px;
-                gridline-color: #ecf0f1;
-                selection-background-color: #3498db;
-            }
-            QTableWidget::item {
-                padding: 10px;
-                border-bottom: 1px solid #ecf0f1;
-                font-size: 13px;
-            }
-            QTableWidget::item:selected {
-                background-color: #6C59F5;
-                color: white;
-            }
-            QHeaderView::section {
-                background-color: #f8f9fa;
-                color: #2c3e50;
-                padding: 10px;
-                border: none;
-                font-weight: 600;
-                font-size: 13px;
-            }
-        """)
+        table.setObjectName("dashboard_table")
         card.layout().addWidget(table)
         
         setattr(self, table_attr, table)
@@ -525,9 +331,9 @@ class DashboardWidget(QWidget):
             tasks_count = self.count_tasks(dashboard_data.get('homework', []))
             self.tasks_label.setText(str(tasks_count))
         
-        if hasattr(self, 'overdue_label'):
-            overdue_count = self.count_overdue_tasks(dashboard_data.get('homework', []))
-            self.overdue_label.setText(str(overdue_count))
+        homework_data = dashboard_data.get('homework')
+        if isinstance(homework_data, dict) and "data" in homework_data:
+            self.deadlines.set_records(homework_data["data"])
             
         if hasattr(self, 'avg_grade_label'):
             avg_grade = self.calculate_average_grade(dashboard_data.get('grades', []))
@@ -550,49 +356,33 @@ class DashboardWidget(QWidget):
         if not grades_data or not self.dashboard_grades_table:
             return
         
-        self.dashboard_grades_table.setRowCount(0)
-        
-        for i, grade in enumerate(grades_data[:8]):
-            self.dashboard_grades_table.insertRow(i)
-            
-            self.dashboard_grades_table.setItem(i, 0, QTableWidgetItem(str(grade.get('name_spec', ''))))
-            self.dashboard_grades_table.setItem(i, 1, QTableWidgetItem(str(grade.get('mark', ''))))
-            self.dashboard_grades_table.setItem(i, 2, QTableWidgetItem(str(grade.get('mark_date', ''))))
-        
-        self.dashboard_grades_table.resizeColumnsToContents()
+        self.dashboard_grades_table.set_rows(
+            (grade.get('name_spec', ''), grade.get('mark', ''), grade.get('mark_date', ''))
+            for grade in grades_data[:8]
+        )
     
     def update_dashboard_leaderboard(self, leaderboard_data):
         if not leaderboard_data or not self.dashboard_leaderboard_table:
             return
         
-        self.dashboard_leaderboard_table.setRowCount(0)
-        
+        rows = []
         if "group" in leaderboard_data and "top" in leaderboard_data["group"]:
-            for i, leader in enumerate(leaderboard_data["group"]["top"][:8]):
-                self.dashboard_leaderboard_table.insertRow(i)
-                
-                self.dashboard_leaderboard_table.setItem(i, 0, QTableWidgetItem(str(leader.get('position', ''))))
-                self.dashboard_leaderboard_table.setItem(i, 1, QTableWidgetItem(str(leader.get('fio_stud', '-'))))
-                self.dashboard_leaderboard_table.setItem(i, 2, QTableWidgetItem(str(leader.get('amount', 0))))
+            rows = [(leader.get('position', ''), leader.get('fio_stud', '-'), leader.get('amount', 0))
+                    for leader in leaderboard_data["group"]["top"][:8]]
         
-        self.dashboard_leaderboard_table.resizeColumnsToContents()
+        self.dashboard_leaderboard_table.set_rows(rows)
     
     def count_tasks(self, homework_data):
         if not homework_data or not isinstance(homework_data, dict) or "data" not in homework_data:
             return 0
         return len(homework_data["data"])
     
-    def count_overdue_tasks(self, homework_data):
-        if not homework_data or not isinstance(homework_data, dict) or "data" not in homework_data:
-            return 0
-        
-        overdue_count = 0
-        for task in homework_data["data"]:
-            status = str(task.get('status', '')).lower()
-            if 'просрочено' in status or 'overdue' in status or 'expired' in status:
-                overdue_count += 1
-        
-        return overdue_count
+    def update_deadline_counts(self):
+        # пустой индекс - счетчики обнуляются, а не остаются от прошлого набора заданий
+        self.overdue_label.setText(str(self.deadlines.count_overdue()))
+        self.overdue_label.setToolTip(
+            f"Сегодня: {self.deadlines.count_today()}, "
+            f"в ближайшие {UPCOMING_DAYS} дней: {self.deadlines.count_due_within(UPCOMING_DAYS)}")
     
     
     
@@ -600,22 +390,17 @@ class DashboardWidget(QWidget):
         if not schedule_data or not hasattr(self, 'dashboard_schedule_table'):
             return
         
-        self.dashboard_schedule_table.setRowCount(0)
-        
+        rows = []
         if isinstance(schedule_data, list):
-            for i, schedule in enumerate(schedule_data[:10]):
-                self.dashboard_schedule_table.insertRow(i)
-                
+            for schedule in schedule_data[:10]:
                 started_at = schedule.get('started_at', '')
                 finished_at = schedule.get('finished_at', '')
                 time_str = f"{started_at} - {finished_at}" if started_at and finished_at else ""
                 
-                self.dashboard_schedule_table.setItem(i, 0, QTableWidgetItem(str(schedule.get('date', ''))))
-                self.dashboard_schedule_table.setItem(i, 1, QTableWidgetItem(str(time_str)))
-                self.dashboard_schedule_table.setItem(i, 2, QTableWidgetItem(str(schedule.get('subject_name', ''))))
-                self.dashboard_schedule_table.setItem(i, 3, QTableWidgetItem(str(schedule.get('teacher_name', ''))))
+                rows.append((schedule.get('date', ''), time_str, schedule.get('subject_name', ''),
+                             schedule.get('teacher_name', '')))
         
-        self.dashboard_schedule_table.resizeColumnsToContents()
+        self.dashboard_schedule_table.set_rows(rows)
         
     def calculate_average_grade(self, grades_data):
         if not grades_data or not isinstance(grades_data, list):
@@ -648,26 +433,50 @@ class DashboardWidget(QWidget):
         return 0
         
     def refresh_data(self):
-        try:
-            self.load_dashboard_data()
-        except Exception as e:
-            print(f"Ошибка обновления данных: {e}")
+        self.refresh_requested.emit()
 
 class MainWindow(QMainWindow):
-    def __init__(self, client):
+    submission_processed = pyqtSignal(dict)
+    
+    # вкладки в порядке кнопок меню: атрибут окна, класс виджета, метод заполнения данными
+    TABS = (
+        ('dashboard', DashboardWidget, 'load_dashboard_data'),
+        ('grades_widget', GradesWidget, 'load_grades_data'),
+        ('attendance_widget', AttendanceWidget, 'load_attendance_data'),
+        ('schedule_widget', ScheduleWidget, 'load_schedule_data'),
+        ('homework_widget', HomeworkWidget, 'load_homework_data'),
+        ('calendar_widget', CalendarWidget, 'load_calendar_data'),
+    )
+    
+    def __init__(self, client, remember=False, prefetch=PREFETCH_TABS):
         super().__init__()
         self.client = client
+        self.remember = remember
+        # последние данные всех наборов - из них заполняется вкладка при первом открытии
+        self.data = {}
+        self.local_loaded = False
+        # идущие синхронизации с заданиями - пока они есть, вкладка заданий не грузит страницы сама
+        self.homework_syncs = 0
+        for attr, _, _ in self.TABS:
+            setattr(self, attr, None)
+        self.prefetch_timer = QTimer(self)
+        self.prefetch_timer.setSingleShot(True)
+        self.prefetch_timer.timeout.connect(self.prefetch_tab)
+        self.store = SyncEngine(client.login)
+        self.outbox = SubmissionOutbox(client, on_change=self.submission_processed.emit)
+        self.submission_processed.connect(self.on_submission_processed)
+        self.reauth_timer = QTimer(self)
+        self.reauth_timer.setSingleShot(True)
+        self.reauth_timer.timeout.connect(self.reauthenticate)
         self.setWindowTitle("MyStat")
         self.setMinimumSize(1600, 900)
         self.resize(1600, 900)
-        self.setStyleSheet("""
-            QMainWindow { 
-                background: qlineargradient(x1:0, y1:0, x2:0, y2:1, 
-                    stop:0 #f8f9fa, stop:1 #e9ecef);
-                font-family: 'Segoe UI', Arial, sans-serif;
-            }
-        """)
+        self.setObjectName("main_window")
         self.init_ui()
+        self.schedule_reauth()
+        self.outbox.start()
+        if prefetch:
+            self.prefetch_timer.start(PREFETCH_DELAY)
         
     def init_ui(self):
         central_widget = QWidget()
@@ -681,27 +490,12 @@ class MainWindow(QMainWindow):
         main_layout.addWidget(sidebar)
         
         self.content_area = QStackedWidget()
-        self.content_area.setStyleSheet("""
-            QStackedWidget { 
-                background: qlineargradient(x1:0, y1:0, x2:0, y2:1, 
-                    stop:0 #f8f9fa, stop:1 #e9ecef);
-                border-radius: 8px;
-            }
-        """)
-        
-        self.dashboard = DashboardWidget(self.client)
-        self.grades_widget = GradesWidget(self.client)
-        self.attendance_widget = AttendanceWidget(self.client)
-        self.schedule_widget = ScheduleWidget(self.client)
-        self.homework_widget = HomeworkWidget(self.client)
-        self.calendar_widget = CalendarWidget(self.client)
-        
-        self.content_area.addWidget(self.dashboard)
-        self.content_area.addWidget(self.grades_widget)
-        self.content_area.addWidget(self.attendance_widget)
-        self.content_area.addWidget(self.schedule_widget)
-        self.content_area.addWidget(self.homework_widget)
-        self.content_area.addWidget(self.calendar_widget)
+        self.content_area.setObjectName("content_area")
+        
+        # сразу строится только дашборд, остальные вкладки - заглушки до первого открытия
+        for _ in self.TABS:
+            self.content_area.addWidget(QWidget())
+        self.build_tab(0)
         
         main_layout.addWidget(self.content_area, 1)
         
@@ -722,89 +516,136 @@ class MainWindow(QMainWindow):
         ]
         
         for i, button in enumerate(self.sidebar_buttons):
-            button.clicked.connect(lambda checked, idx=i: self.content_area.setCurrentIndex(idx))
+            button.clicked.connect(lambda checked, idx=i: self.show_tab(idx))
             button.clicked.connect(lambda checked, btn=button: self.update_sidebar_selection(btn))
         
+    def build_tab(self, index):
+        attr, widget_class, loader = self.TABS[index]
+        widget = getattr(self, attr)
+        if widget is not None:
+            return widget
+        
+        widget = widget_class(self.client)
+        setattr(self, attr, widget)
+        if widget is self.dashboard:
+            widget.refresh_requested.connect(self.start_sync)
+        if widget is self.homework_widget:
+            widget.outbox = self.outbox
+            widget.homework_loaded.connect(self.on_homework_loaded)
+        placeholder = self.content_area.widget(index)
+        self.content_area.insertWidget(index, widget)
+        self.content_area.removeWidget(placeholder)
+        placeholder.deleteLater()
+        
+        getattr(self, loader)(self.data)
+        if (widget is self.homework_widget and self.local_loaded and not self.data.get('homework')
+                and not self.homework_syncs):
+            # заданий еще нет ни в БД, ни от синхронизации - показываются по мере загрузки страниц
+            widget.load_progressively()
+        return widget
+    
+    def show_tab(self, index):
+        self.build_tab(index)
+        self.content_area.setCurrentIndex(index)
+    
+    def prefetch_tab(self):
+        # по одной вкладке за срабатывание таймера - между ними окно успевает обработать события
+        for index, (attr, _, _) in enumerate(self.TABS):
+            if getattr(self, attr) is None:
+                self.build_tab(index)
+                self.prefetch_timer.start(0)
+                return
+    
+    def data_widgets(self):
+        return tuple(widget for widget in (getattr(self, attr) for attr, _, _ in self.TABS) if widget is not None)
+    
     def load_data(self):
-        try:
-            token_data = self.client.get_user_info()
-            if token_data:
-                self.load_dashboard_data()
-                self.load_grades_data()
-                self.load_attendance_data()
-                self.load_schedule_data()
-                self.load_homework_data()
-                self.load_calendar_data()
-                
-                self.content_area.setCurrentIndex(0)
-                
-        except Exception as e:
-            print(f"Ошибка загрузки данных: {e}")
+        # окно показывается сразу: чтение БД и сверка с API идут в пуле потоков
+        if not self.client.get_user_info():
+            return
+        self.content_area.setCurrentIndex(0)
+        run_in_background(self.store.load_all, on_result=self.on_local_data,
+                          on_error=lambda error: self.on_local_data({}), owners=self.data_widgets())
+    
+    def on_local_data(self, local_data):
+        # сначала то, что уже сохранено в БД - без сети
+        self.local_loaded = True
+        self.apply_data(local_data)
+        if local_data.get('homework') or self.homework_widget is None:
+            self.start_sync()
+        else:
+            # первый запуск: задания показываются по мере загрузки страниц и из них же сохраняются в БД,
+            # синхронизация второй раз их не качает
+            self.homework_widget.load_progressively()
+            self.start_sync(homework=False)
+    
+    def start_sync(self, homework=True):
+        worker = run_in_background(self.store.sync, self.client, homework=homework,
+                                   on_result=self.apply_data, owners=self.data_widgets())
+        if homework:
+            self.homework_syncs += 1
+            worker.signals.finished.connect(self.on_homework_synced)
+    
+    def on_homework_synced(self):
+        self.homework_syncs -= 1
+    
+    def on_homework_loaded(self, homework_data):
+        # список уже нарисован по страницам - обновляются остальные вкладки, а сам список сохраняется в БД
+        self.data['homework'] = homework_data
+        for attr, _, loader in self.TABS:
+            if attr != 'homework_widget' and getattr(self, attr) is not None:
+                getattr(self, loader)(self.data)
+        run_in_background(self.store.save_homework, homework_data)
     
-    def load_dashboard_data(self):
+    def apply_data(self, data):
+        # заполняются только построенные вкладки, остальные возьмут данные из self.data при открытии
+        self.data.update(data)
+        for attr, _, loader in self.TABS:
+            if getattr(self, attr) is not None:
+                getattr(self, loader)(self.data)
+    
+    def load_dashboard_data(self, data):
         try:
-            dashboard_data = {}
-            
-            grades_data = self.client.marks()
-            if grades_data:
-                dashboard_data['grades'] = grades_data
-            
-            leaderboard_data = self.client.leaderboard()
-            if leaderboard_data:
-                dashboard_data['leaderboard'] = leaderboard_data
-            
-            homework_data = self.client.homework()
-            if homework_data:
-                dashboard_data['homework'] = homework_data
-            
-            schedule_data = self.client.schedule()
-            if schedule_data:
-                dashboard_data['schedule'] = schedule_data
-                
-            attendance_data = self.client.attendance()
-            if attendance_data:
-                dashboard_data['attendance'] = attendance_data
-            
-            self.dashboard.update_data(dashboard_data)
+            self.dashboard.update_data(data)
         except Exception as e:
             print(f"Ошибка загрузки дашборда: {e}")
     
-    def load_grades_data(self):
+    def load_grades_data(self, data):
         try:
-            marks_data = self.client.marks()
+            marks_data = data.get('grades')
             if marks_data:
                 self.grades_widget.update_data(marks_data)
         except Exception as e:
             print(f"Ошибка загрузки оценок: {e}")
     
-    def load_attendance_data(self):
+    def load_attendance_data(self, data):
         try:
-            attendance_data = self.client.attendance()
+            attendance_data = data.get('attendance')
             if attendance_data:
                 self.attendance_widget.update_data(attendance_data)
         except Exception as e:
             print(f"Ошибка загрузки посещаемости: {e}")
     
-    def load_schedule_data(self):
+    def load_schedule_data(self, data):
         try:
-            schedule_data = self.client.schedule()
+            schedule_data = data.get('schedule')
             if schedule_data:
                 self.schedule_widget.update_data(schedule_data)
         except Exception as e:
             print(f"Ошибка загрузки расписания: {e}")
     
-    def load_homework_data(self):
+    def load_homework_data(self, data):
         try:
-            homework_data = self.client.homework()
+            homework_data = data.get('homework')
             if homework_data:
                 self.homework_widget.update_data(homework_data)
         except Exception as e:
             print(f"Ошибка загрузки домашних заданий: {e}")
     
-    def load_calendar_data(self):
+    def load_calendar_data(self, data):
         try:
-            schedule_data = self.client.schedule()
-            homework_data = self.client.homework()
+            schedule_data = data.get('schedule')
+            homework_data = data.get('homework')
             if schedule_data or homework_data:
                 self.calendar_widget.update_data(schedule_data, homework_data)
         except Exception as e:
@@ -813,14 +654,7 @@ class MainWindow(QMainWindow):
     def create_sidebar(self):
         sidebar = QFrame()
         sidebar.setFixedWidth(220)
-        sidebar.setStyleSheet("""
-            QFrame { 
-                background: qlineargradient(x1:0, y1:0, x2:1, y2:0, 
-                    stop:0 #2c3e50, stop:1 #34495e);
-                border: none;
-                border-right: 2px solid #34495e;
-            }
-        """)
+        sidebar.setObjectName("sidebar")
         
         layout = QVBoxLayout()
         layout.setContentsMargins(10, 20, 10, 20)
@@ -845,19 +679,7 @@ class MainWindow(QMainWindow):
         
         logout_btn = QPushButton("Выход")
         logout_btn.setFixedHeight(45)
-        logout_btn.setStyleSheet("""
-            QPushButton { 
-                background-color: #e74c3c;
-                color: white; 
-                border: none;
-                border-radius: 8px;
-                font-size: 14px;
-                font-weight: 600;
-            }
-            QPushButton:hover { 
-                background-color: #c0392b;
-            }
-        """)
+        logout_btn.setObjectName("logout_btn")
         logout_btn.clicked.connect(self.logout)
         layout.addWidget(logout_btn)
         
@@ -868,8 +690,51 @@ class MainWindow(QMainWindow):
         for button in self.sidebar_buttons:
             button.setChecked(button == active_button)
             
+    def schedule_reauth(self):
+        seconds_left = self.client.tokens.seconds_left()
+        if seconds_left is None or not self.client.password:
+            return
+        
+        delay_ms = max(0, seconds_left - REAUTH_MARGIN) * 1000
+        self.reauth_timer.start(int(min(delay_ms, 2**31 - 1)))
+    
+    def reauthenticate(self):
+        run_in_background(self._reauthenticate, on_result=self.on_token_refreshed)
+    
+    def _reauthenticate(self):
+        try:
+            success = self.client.authenticate()
+        except Exception as e:
+            print(f"Ошибка фонового входа: {e}")
+            success = False
+        
+        expires_at = self.client.tokens.expires_at()
+        if success and self.remember and expires_at is not None:
+            save_session(self.client.login, self.client.token, expires_at)
+        return success
+    
+    def on_token_refreshed(self, success):
+        if success:
+            self.schedule_reauth()
+            # задания из очереди могли ждать нового токена
+            self.outbox.wake()
+        else:
+            self.reauth_timer.start(60000)
+    
+    def on_submission_processed(self, item):
+        if item['status'] == 'sent':
+            self.statusBar().showMessage("Задание отправлено на проверку", 10000)
+            self.start_sync()
+        else:
+            QMessageBox.warning(self, "Задание не отправлено",
+                                f"Не удалось отправить задание: {item['last_error']}")
+    
     def logout(self):
+        self.reauth_timer.stop()
+        self.outbox.stop()
+        clear_session(self.client.login)
         self.close()
+        self.client.close()
         self.login_window = LoginWindow()
         self.login_window.show()
 
@@ -883,11 +748,21 @@ def main():
     
     app = QApplication(sys.argv)
     app.setStyle('Fusion')
+    apply_theme(app)
+    
+    init_db()
     
-    login_window = LoginWindow()
-    login_window.show()
+    client = restore_client()
+    if client:
+        window = MainWindow(client, remember=True)
+    else:
+        window = LoginWindow()
+    window.show()
     
-    sys.exit(app.exec_())
+    exit_code = app.exec_()
+    # фоновые задачи должны закончиться до того, как Python начнет удалять объекты
+    QThreadPool.globalInstance().waitForDone(SHUTDOWN_TIMEOUT)
+    sys.exit(exit_code)
 
 if __name__ == "__main__":
     main()
@@ -1,8 +1,8 @@
 # описание моделей SQLAlckemy (таблицы БД)
 
-from sqlalchemy import Column, Integer, String, Text, TIMESTAMP, Numeric
+from sqlalchemy import Column, Integer, Float, String, Text, TIMESTAMP, Numeric, UniqueConstraint, inspect
 from sqlalchemy.sql import func
-from core import Base
+from core import Base, engine
 
 class User(Base):
     __tablename__ = "users"
@@ -13,41 +13,127 @@ class User(Base):
     role = Column(String, default="student")  # Student, teacher, admin
     created_at = Column(TIMESTAMP, server_default=func.now())
 
+# Mark, Attendance, Homework, Schedule - локальное хранилище ответов API (interface/sync_engine.py):
+# строка на запись, ключ (login, upstream_id), исходная запись целиком в payload
+
 class Mark(Base):
     __tablename__ = "marks"
+    __table_args__ = (UniqueConstraint('login', 'upstream_id'),)
 
     id = Column(Integer, primary_key=True, index=True)
+    login = Column(String, nullable=False, index=True)
+    upstream_id = Column(String, nullable=False)
+    position = Column(Integer, nullable=False, default=0)
     date = Column(String, nullable=False)
     subject = Column(String, nullable=False)
-    value = Column(Numeric(4, 2), nullable=False)
+    value = Column(Numeric(4, 2))
     teacher = Column(String, nullable=False)
+    payload = Column(Text, nullable=False)
     created_at = Column(TIMESTAMP, server_default=func.now())
 
 class Attendance(Base):
     __tablename__ = "attendance"
+    __table_args__ = (UniqueConstraint('login', 'upstream_id'),)
 
     id = Column(Integer, primary_key=True, index=True)
-    date = Column(String, nullable=False)
+    login = Column(String, nullable=False, index=True)
+    upstream_id = Column(String, nullable=False)
+    position = Column(Integer, nullable=False, default=0)
+    date = Column(String, nullable=False)  # "год-месяц-день" - ключи из ответа API
     status = Column(String, nullable=False)
     subject = Column(String)
     theme = Column(Text)
+    payload = Column(Text, nullable=False)
     created_at = Column(TIMESTAMP, server_default=func.now())
 
 class Homework(Base):
     __tablename__ = "homework"
+    __table_args__ = (UniqueConstraint('login', 'upstream_id'),)
 
     id = Column(Integer, primary_key=True, index=True)
+    login = Column(String, nullable=False, index=True)
+    upstream_id = Column(String, nullable=False)
+    position = Column(Integer, nullable=False, default=0)
     theme = Column(String, nullable=False)
-    status = Column(String, nullable=False)
+    status = Column(String, nullable=False)  # статус-фильтр списка homework/list
+    subject = Column(String)
+    completion_time = Column(String)
+    payload = Column(Text, nullable=False)
     created_at = Column(TIMESTAMP, server_default=func.now())
 
 class Schedule(Base):
     __tablename__ = "schedule"
+    __table_args__ = (UniqueConstraint('login', 'upstream_id'),)
 
     id = Column(Integer, primary_key=True, index=True)
+    login = Column(String, nullable=False, index=True)
+    upstream_id = Column(String, nullable=False)
+    position = Column(Integer, nullable=False, default=0)
     date = Column(String, nullable=False)
     subject = Column(String, nullable=False)
     start_time = Column(String, nullable=False)
     end_time = Column(String, nullable=False)
     teacher = Column(String, nullable=False)
+    payload = Column(Text, nullable=False)
+    created_at = Column(TIMESTAMP, server_default=func.now())
+
+class SyncState(Base):
+    __tablename__ = "sync_state"
+    __table_args__ = (UniqueConstraint('login', 'key'),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    login = Column(String, nullable=False)
+    key = Column(String, nullable=False)
+    value = Column(String)
+    updated_at = Column(TIMESTAMP, server_default=func.now(), onupdate=func.now())
+
+class StoredSession(Base):
+    __tablename__ = "sessions"
+
+    id = Column(Integer, primary_key=True, index=True)
+    login = Column(String, unique=True, nullable=False)
+    token = Column(Text, nullable=False)  # зашифрован (Fernet)
+    expires_at = Column(Integer, nullable=False)  # unix time из claim "exp"
+    updated_at = Column(TIMESTAMP, server_default=func.now(), onupdate=func.now())
+
+class OutboxSubmission(Base):
+    # очередь отправки заданий (interface/outbox.py): одна запись на задание, переживает перезапуск
+    __tablename__ = "outbox"
+    __table_args__ = (UniqueConstraint('login', 'homework_id'),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    login = Column(String, nullable=False, index=True)
+    homework_id = Column(String, nullable=False)
+    idempotency_key = Column(String, nullable=False, unique=True)
+    file_path = Column(Text)
+    answer_text = Column(Text)
+    status = Column(String, nullable=False, default="pending")  # pending, sent, failed, cancelled
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(Float, nullable=False, default=0)  # unix time
+    last_error = Column(Text)
     created_at = Column(TIMESTAMP, server_default=func.now())
+    updated_at = Column(TIMESTAMP, server_default=func.now(), onupdate=func.now())
+
+class UploadedFile(Base):
+    # загруженные в хранилище файлы по sha256 содержимого (interface/upload_index.py)
+    __tablename__ = "uploads"
+    __table_args__ = (UniqueConstraint('login', 'sha256', 'homework_dir_id'),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    login = Column(String, nullable=False)
+    sha256 = Column(String, nullable=False)
+    homework_dir_id = Column(String, nullable=False)
+    size = Column(Integer, nullable=False)
+    link = Column(Text, nullable=False)
+    created_at = Column(TIMESTAMP, server_default=func.now())
+
+def init_db():
+    inspector = inspect(engine)
+    for model in (Mark, Attendance, Homework, Schedule):
+        table = model.__tablename__
+        if inspector.has_table(table):
+            columns = {column['name'] for column in inspector.get_columns(table)}
+            if 'upstream_id' not in columns:
+                # таблицы старой схемы ни разу не заполнялись - пересоздаем
+                model.__table__.drop(bind=engine)
+    Base.metadata.create_all(bind=engine)
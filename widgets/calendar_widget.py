@@ -20,13 +20,7 @@ class CalendarWidget(QWidget):
         layout.setSpacing(20)
         
         title = QLabel("Календарь")
-        title.setStyleSheet("""
-            font-size: 28px; 
-            font-weight: 700; 
-            color: #2c3e50;
-            padding: 10px 0px;
-            margin-bottom: 10px;
-        """)
+        title.setObjectName("calendar_title")
         layout.addWidget(title)
         
         content_layout = QHBoxLayout()
@@ -47,91 +41,14 @@ class CalendarWidget(QWidget):
         
     def create_calendar_section(self):
         calendar_frame = QFrame()
-        calendar_frame.setStyleSheet("""
-            QFrame {
-                background-color: white;
-                border: 1px solid #e1e8ed;
-                border-radius: 12px;
-                padding: 20px;
-            }
-        """)
+        calendar_frame.setObjectName("calendar_frame")
         
         layout = QVBoxLayout()
         layout.setContentsMargins(20, 20, 20, 20)
         layout.setSpacing(15)
         
         self.calendar = QCalendarWidget()
-        self.calendar.setStyleSheet("""
-            QCalendarWidget {
-                background-color: white;
-                border: 1px solid #e1e8ed;
-                border-radius: 8px;
-            }
-            QCalendarWidget QWidget {
-                alternate-background-color: #f8f9fa;
-            }
-            QCalendarWidget QAbstractItemView:enabled {
-                background-color: white;
-                selection-background-color: #6C59F5;
-                selection-color: white;
-            }
-            QCalendarWidget QAbstractItemView:disabled {
-                color: #bdc3c7;
-            }
-            QCalendarWidget QWidget#qt_calendar_navigationbar {
-                background-color: #6C59F5;
-                border-radius: 8px 8px 0px 0px;
-            }
-            QCalendarWidget QToolButton {
-                background-color: transparent;
-                color: white;
-                font-weight: bold;
-                font-size: 14px;
-                padding: 8px;
-                border: none;
-            }
-            QCalendarWidget QToolButton:hover {
-                background-color: rgba(255, 255, 255, 0.2);
-                border-radius: 4px;
-            }
-            QCalendarWidget QToolButton:pressed {
-                background-color: rgba(255, 255, 255, 0.3);
-            }
-            QCalendarWidget QSpinBox {
-                background-color: transparent;
-                color: white;
-                font-weight: bold;
-                font-size: 16px;
-                border: none;
-                padding: 4px;
-            }
-            QCalendarWidget QSpinBox::up-button, QCalendarWidget QSpinBox::down-button {
-                background-color: transparent;
-                border: none;
-                width: 0px;
-            }
-            QCalendarWidget QWidget#qt_calendar_calendarview {
-                background-color: white;
-            }
-            QCalendarWidget QAbstractItemView {
-                selection-background-color: #6C59F5;
-                selection-color: white;
-                border: none;
-            }
-            QCalendarWidget QAbstractItemView:item {
-                padding: 8px;
-                border: none;
-            }
-            QCalendarWidget QAbstractItemView:item:selected {
-                background-color: #6C59F5;
-                color: white;
-                border-radius: 4px;
-            }
-            QCalendarWidget QAbstractItemView:item:hover {
-                background-color: #ecf0f1;
-                border-radius: 4px;
-            }
-        """)
+        self.calendar.setObjectName("calendar")
         
         self.calendar.selectionChanged.connect(self.on_date_selected)
         
@@ -141,40 +58,14 @@ class CalendarWidget(QWidget):
         nav_layout.setSpacing(10)
         
         self.today_btn = QPushButton("Сегодня")
-        self.today_btn.setStyleSheet("""
-            QPushButton {
-                background-color: #6C59F5;
-                color: white;
-                border: none;
-                border-radius: 6px;
-                padding: 8px 16px;
-                font-weight: 600;
-                font-size: 12px;
-            }
-            QPushButton:hover {
-                background-color: #5A4AE8;
-            }
-        """)
+        self.today_btn.setObjectName("today_btn")
         self.today_btn.clicked.connect(self.go_to_today)
         
         self.prev_week_btn = QPushButton("◀ Неделя")
         self.next_week_btn = QPushButton("Неделя ▶")
         
         for btn in [self.prev_week_btn, self.next_week_btn]:
-            btn.setStyleSheet("""
-                QPushButton {
-                    background-color: #ecf0f1;
-                    color: #2c3e50;
-                    border: none;
-                    border-radius: 6px;
-                    padding: 8px 12px;
-                    font-weight: 600;
-                    font-size: 12px;
-                }
-                QPushButton:hover {
-                    background-color: #bdc3c7;
-                }
-            """)
+            btn.setObjectName("week_btn")
         
         self.prev_week_btn.clicked.connect(self.go_to_previous_week)
         self.next_week_btn.clicked.connect(self.go_to_next_week)
@@ -191,69 +82,26 @@ class CalendarWidget(QWidget):
         
     def create_events_section(self):
         events_frame = QFrame()
-        events_frame.setStyleSheet("""
-            QFrame {
-                background-color: white;
-                border: 1px solid #e1e8ed;
-                border-radius: 12px;
-                padding: 20px;
-            }
-        """)
+        events_frame.setObjectName("events_frame")
         
         layout = QVBoxLayout()
         layout.setContentsMargins(20, 20, 20, 20)
         layout.setSpacing(15)
         
         events_title = QLabel("События дня")
-        events_title.setStyleSheet("""
-            font-size: 18px; 
-            font-weight: 600; 
-            color: #2c3e50;
-            padding: 5px 0px;
-        """)
+        events_title.setObjectName("events_title")
         layout.addWidget(events_title)
         
         self.selected_date_label = QLabel()
-        self.selected_date_label.setStyleSheet("""
-            font-size: 14px; 
-            color: #7f8c8d;
-            padding: 5px 0px;
-        """)
+        self.selected_date_label.setObjectName("selected_date_label")
         layout.addWidget(self.selected_date_label)
         
         self.events_list = QListWidget()
-        self.events_list.setStyleSheet("""
-            QListWidget {
-                background-color: #f8f9fa;
-                border: 1px solid #e1e8ed;
-                border-radius: 8px;
-                padding: 10px;
-            }
-            QListWidget::item {
-                background-color: white;
-                border: 1px solid #e1e8ed;
-                border-radius: 6px;
-                padding: 12px;
-                margin: 4px 0px;
-            }
-            QListWidget::item:hover {
-                background-color: #ecf0f1;
-                border-color: #6C59F5;
-            }
-            QListWidget::item:selected {
-                background-color: #6C59F5;
-                color: white;
-                border-color: #5A4AE8;
-            }
-        """)
+        self.events_list.setObjectName("events_list")
         layout.addWidget(self.events_list)
         
         self.stats_label = QLabel()
-        self.stats_label.setStyleSheet("""
-            font-size: 12px; 
-            color: #7f8c8d;
-            padding: 10px 0px;
-        """)
+        self.stats_label.setObjectName("events_stats_label")
         layout.addWidget(self.stats_label)
         
         events_frame.setLayout(layout)
@@ -0,0 +1,89 @@
+# таблицы на модели: значения хранятся по столбцам, сортировка и фильтр - через прокси,
+# обновление - одним сбросом модели вместо вставки строк по одной
+
+from PyQt5.QtWidgets import QTableView
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex, QSortFilterProxyModel
+
+SortRole = Qt.UserRole
+
+# ширина столбцов считается по первым SAMPLE_ROWS строкам, а не по всей таблице
+SAMPLE_ROWS = 200
+# отступы ячейки из стилей (padding слева и справа) и запас под индикатор сортировки
+CELL_PADDING = 40
+
+def _sort_key(value):
+    # оценки, места и баллы сортируются как числа, остальное - как текст
+    try:
+        return float(value)
+    except ValueError:
+        return value
+
+class ColumnTableModel(QAbstractTableModel):
+    def __init__(self, headers, parent=None):
+        super().__init__(parent)
+        self.headers = list(headers)
+        self.columns = [[] for _ in self.headers]
+        self.row_count = 0
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self.row_count
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.headers)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        if role == Qt.DisplayRole:
+            return self.columns[index.column()][index.row()]
+        if role == SortRole:
+            return _sort_key(self.columns[index.column()][index.row()])
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return self.headers[section]
+        return super().headerData(section, orientation, role)
+
+    def set_rows(self, rows):
+        # rows - кортежи по числу столбцов; раскладываются по столбцам за один проход
+        rows = list(rows)
+        self.beginResetModel()
+        if rows:
+            self.columns = [list(map(str, column)) for column in zip(*rows)]
+        else:
+            self.columns = [[] for _ in self.headers]
+        self.row_count = len(rows)
+        self.endResetModel()
+
+class DataTable(QTableView):
+    def __init__(self, headers, parent=None):
+        super().__init__(parent)
+        self.source = ColumnTableModel(headers, self)
+        self.proxy = QSortFilterProxyModel(self)
+        self.proxy.setSourceModel(self.source)
+        self.proxy.setSortRole(SortRole)
+        self.proxy.setFilterKeyColumn(-1)
+        self.proxy.setFilterCaseSensitivity(Qt.CaseInsensitive)
+        self.setModel(self.proxy)
+        # до первого щелчка по заголовку строки идут в порядке API
+        self.horizontalHeader().setSortIndicator(-1, Qt.AscendingOrder)
+        self.setSortingEnabled(True)
+        self.horizontalHeader().setStretchLastSection(True)
+
+    def set_rows(self, rows):
+        self.source.set_rows(rows)
+        self.fit_columns()
+
+    def set_filter(self, text):
+        # строка остается, если текст есть хотя бы в одном столбце
+        self.proxy.setFilterFixedString(text)
+
+    def fit_columns(self):
+        # как resizeColumnsToContents, но по выборке строк - время не зависит от размера таблицы
+        metrics = self.fontMetrics()
+        header_metrics = self.horizontalHeader().fontMetrics()
+        for column, values in enumerate(self.source.columns):
+            widths = [metrics.horizontalAdvance(value) for value in values[:SAMPLE_ROWS]]
+            widths.append(header_metrics.horizontalAdvance(self.source.headers[column]))
+            self.setColumnWidth(column, max(widths) + CELL_PADDING)
@@ -0,0 +1,105 @@
+# индекс сроков сдачи: даты разбираются один раз в порядковые дни и хранятся отсортированными,
+# счетчики "просрочено / сегодня / в ближайшие N дней" - бинарным поиском; смену дня отслеживает
+# один таймер на полночь, а не datetime.now() при каждой отрисовке карточки
+
+from bisect import bisect_left, bisect_right, insort
+from datetime import date, datetime, time, timedelta
+
+from PyQt5.QtCore import QCoreApplication, QObject, QTimer, pyqtSignal
+
+DATE_FORMATS = ('%d.%m.%Y', '%Y-%m-%d', '%d/%m/%Y')
+# запас после полуночи, чтобы таймер не сработал чуть раньше смены даты, мс
+MIDNIGHT_MARGIN = 1000
+
+_shared = None
+
+def parse_due_day(completion_time):
+    # порядковый день (date.toordinal) или None, если срок не указан или не разбирается
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(completion_time, fmt).toordinal()
+        except (TypeError, ValueError):
+            continue
+    return None
+
+def deadline_index():
+    # один индекс на приложение: его читают дашборд и список заданий, таймер полуночи тоже один
+    global _shared
+    if _shared is None:
+        _shared = DeadlineIndex(QCoreApplication.instance())
+    return _shared
+
+class DeadlineIndex(QObject):
+    # changed - изменился набор заданий, day_changed - наступил новый день
+    changed = pyqtSignal()
+    day_changed = pyqtSignal()
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.today = date.today().toordinal()
+        # сроки заданий в порядковых днях, по возрастанию; задания без срока не учитываются
+        self.days = []
+        # строка срока -> порядковый день; у заданий повторяются одни и те же даты
+        self._parsed = {}
+        self.midnight_timer = QTimer(self)
+        self.midnight_timer.setSingleShot(True)
+        self.midnight_timer.timeout.connect(self.on_midnight)
+        self.schedule_midnight()
+
+    def schedule_midnight(self):
+        now = datetime.now()
+        midnight = datetime.combine(now.date() + timedelta(days=1), time())
+        self.midnight_timer.start(int((midnight - now).total_seconds() * 1000) + MIDNIGHT_MARGIN)
+
+    def on_midnight(self):
+        today = date.today().toordinal()
+        if today != self.today:
+            # дни заданий не меняются - сдвигается только граница "сегодня" для бинарного поиска
+            self.today = today
+            self.day_changed.emit()
+        self.schedule_midnight()
+
+    def due_day(self, homework):
+        completion_time = homework.get('completion_time', '')
+        if completion_time not in self._parsed:
+            self._parsed[completion_time] = parse_due_day(completion_time)
+        return self._parsed[completion_time]
+
+    def set_records(self, records):
+        days = (self.due_day(homework) for homework in records)
+        self.days = sorted(day for day in days if day is not None)
+        self.changed.emit()
+
+    def add_records(self, records):
+        # догруженная страница вставляется на свои места, без пересортировки всего списка
+        for homework in records:
+            day = self.due_day(homework)
+            if day is not None:
+                insort(self.days, day)
+        if records:
+            self.changed.emit()
+
+    def days_left(self, homework):
+        day = self.due_day(homework)
+        return None if day is None else day - self.today
+
+    def status(self, homework):
+        # текст и статус срока сдачи; цвет статуса - theme.STATUS_COLORS
+        days_left = self.days_left(homework)
+        if days_left is None:
+            return "Не указан", 'unknown'
+        if days_left < 0:
+            return f"Просрочено: {-days_left} дней", 'overdue'
+        if days_left == 0:
+            return "Сегодня", 'today'
+        return f"В дедлайн: {days_left} дней", 'ok'
+
+    def count_overdue(self):
+        return bisect_left(self.days, self.today)
+
+    def count_today(self):
+        return bisect_right(self.days, self.today) - bisect_left(self.days, self.today)
+
+    def count_due_within(self, days):
+        # со сроком с завтрашнего дня по days-й включительно
+        return bisect_right(self.days, self.today + days) - bisect_right(self.days, self.today)
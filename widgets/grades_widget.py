@@ -1,4 +1,6 @@
-from PyQt5.QtWidgets import QWidget, QVBoxLayout, QLabel, QTableWidget, QTableWidgetItem
+from PyQt5.QtWidgets import QWidget, QVBoxLayout, QLabel, QLineEdit
+
+from .data_table import DataTable
 
 class GradesWidget(QWidget):
     
@@ -14,51 +16,25 @@ class GradesWidget(QWidget):
         layout.setSpacing(15)
         
         title = QLabel("Оценки")
-        title.setStyleSheet("""
-            font-size: 24px; 
-            font-weight: 700; 
-            color: #2c3e50;
-            padding: 20px 0px;
-        """)
+        title.setObjectName("page_title")
         layout.addWidget(title)
         
+        self.filter_input = QLineEdit()
+        self.filter_input.setPlaceholderText("Поиск")
+        self.filter_input.setClearButtonEnabled(True)
+        self.filter_input.setObjectName("filter_input")
+        layout.addWidget(self.filter_input)
+        
         self.table = self.create_grades_table()
+        self.filter_input.textChanged.connect(self.table.set_filter)
         layout.addWidget(self.table)
         
         self.setLayout(layout)
         
     def create_grades_table(self):
-        table = QTableWidget()
-        table.setColumnCount(4)
-        table.setHorizontalHeaderLabels(["Дата", "Предмет", "Преподаватель", "Оценка"])
-        table.setRowCount(0)
-        table.horizontalHeader().setStretchLastSection(True)
+        table = DataTable(["Дата", "Предмет", "Преподаватель", "Оценка"])
         
-        table.setStyleSheet("""
-            QTableWidget {
-                background-color: white;
-                border: 1px solid #e1e8ed;
-                border-radius: 8px;
-                gridline-color: #ecf0f1;
-                selection-background-color: #6C59F5;
-            }
-            QTableWidget::item {
-                padding: 12px;
-                border-bottom: 1px solid #ecf0f1;
-            }
-            QTableWidget::item:selected {
-                background-color: #6C59F5;
-                color: white;
-            }
-            QHeaderView::section {
-                background-color: #6C59F5;
-                color: white;
-                padding: 12px;
-                border: none;
-                font-weight: 600;
-                font-size: 13px;
-            }
-        """)
+        table.setObjectName("data_table")
         
         return table
     
@@ -66,15 +42,9 @@ class GradesWidget(QWidget):
         if not marks_data or not self.table:
             return
         
-        self.table.setRowCount(0)
-        
-        for i, mark in enumerate(marks_data):
-            self.table.insertRow(i)
-            if isinstance(mark, dict):
-                self.table.setItem(i, 0, QTableWidgetItem(str(mark.get('mark_date', ''))))
-                self.table.setItem(i, 1, QTableWidgetItem(str(mark.get('name_spec', ''))))
-                self.table.setItem(i, 2, QTableWidgetItem(str(mark.get('fio_teach', ''))))
-                self.table.setItem(i, 3, QTableWidgetItem(str(mark.get('mark', ''))))
-        
-        self.table.resizeColumnsToContents()
+        self.table.set_rows(
+            (mark.get('mark_date', ''), mark.get('name_spec', ''), mark.get('fio_teach', ''), mark.get('mark', ''))
+            if isinstance(mark, dict) else ('', '', '', '')
+            for mark in marks_data
+        )
         
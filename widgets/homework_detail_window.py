@@ -1,10 +1,13 @@
 from PyQt5.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel, 
                              QPushButton, QTextEdit, QFrame, QFileDialog, 
-                             QMessageBox, QScrollArea, QWidget)
+                             QMessageBox, QScrollArea, QWidget, QProgressDialog)
 from PyQt5.QtCore import Qt, pyqtSignal
 from PyQt5.QtGui import QFont, QPixmap, QPainter, QColor
 import os
 
+from .workers import Worker
+from .deadlines import deadline_index
+
 class HomeworkDetailWindow(QDialog):
     homework_submitted = pyqtSignal(dict)
     
@@ -13,6 +16,10 @@ class HomeworkDetailWindow(QDialog):
         self.homework_data = homework_data
         self.selected_file_path = None
         self.client = None
+        self.outbox = None
+        self.downloader = None
+        self.submitter = None
+        self.progress_dialog = None
         self.setWindowTitle("Детали задания")
         self.setMinimumSize(600, 700)
         self.resize(800, 800)
@@ -26,19 +33,7 @@ class HomeworkDetailWindow(QDialog):
         
         close_btn = QPushButton("✕")
         close_btn.setFixedSize(30, 30)
-        close_btn.setStyleSheet("""
-            QPushButton {
-                background-color: #f8f9fa;
-                border: 1px solid #e1e8ed;
-                border-radius: 15px;
-                font-size: 14px;
-                color: #6c757d;
-            }
-            QPushButton:hover {
-                background-color: #e9ecef;
-                color: #495057;
-            }
-        """)
+        close_btn.setObjectName("close_btn")
         close_btn.clicked.connect(self.close)
         
         header_layout = QHBoxLayout()
@@ -51,12 +46,7 @@ class HomeworkDetailWindow(QDialog):
         scroll_area.setWidgetResizable(True)
         scroll_area.setVerticalScrollBarPolicy(Qt.ScrollBarAsNeeded)
         scroll_area.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
-        scroll_area.setStyleSheet("""
-            QScrollArea {
-                border: none;
-                background-color: transparent;
-            }
-        """)
+        scroll_area.setObjectName("detail_scroll")
         
         content_widget = QWidget()
         content_layout = QVBoxLayout()
@@ -82,20 +72,12 @@ class HomeworkDetailWindow(QDialog):
         
         date = self.homework_data.get('completion_time', 'Не указан')
         date_label = QLabel(date)
-        date_label.setStyleSheet("""
-            color: #6c757d;
-            font-size: 14px;
-            font-weight: 500;
-        """)
+        date_label.setObjectName("detail_meta")
         date_subject_layout.addWidget(date_label)
         
         subject = self.homework_data.get('name_spec', 'Не указан')
         subject_label = QLabel(subject)
-        subject_label.setStyleSheet("""
-            color: #6c757d;
-            font-size: 14px;
-            font-weight: 500;
-        """)
+        subject_label.setObjectName("detail_meta")
         date_subject_layout.addStretch()
         date_subject_layout.addWidget(subject_label)
         
@@ -103,48 +85,20 @@ class HomeworkDetailWindow(QDialog):
         
         theme = self.homework_data.get('theme', 'Без темы')
         title_label = QLabel(theme)
-        title_label.setStyleSheet("""
-            color: #2c3e50;
-            font-size: 24px;
-            font-weight: 700;
-            margin: 10px 0px;
-        """)
+        title_label.setObjectName("detail_title")
         title_label.setWordWrap(True)
         parent_layout.addWidget(title_label)
         
     def create_open_task_button(self, parent_layout):
         open_btn = QPushButton("Открыть задачу")
         open_btn.setFixedHeight(50)
-        open_btn.setStyleSheet("""
-            QPushButton {
-                background-color: #6C59F5;
-                color: white;
-                border: none;
-                border-radius: 12px;
-                font-size: 16px;
-                font-weight: 600;
-                padding: 0px 20px;
-            }
-            QPushButton:hover {
-                background-color: #5A4AE8;
-            }
-            QPushButton:pressed {
-                background-color: #4A3BD1;
-            }
-        """)
+        open_btn.setObjectName("open_task_btn")
         open_btn.clicked.connect(self.open_task_file)
         parent_layout.addWidget(open_btn)
         
     def create_deadline_section(self, parent_layout):
         deadline_frame = QFrame()
-        deadline_frame.setStyleSheet("""
-            QFrame {
-                background-color: #f8f9fa;
-                border: 1px solid #e9ecef;
-                border-radius: 12px;
-                padding: 15px;
-            }
-        """)
+        deadline_frame.setObjectName("deadline_frame")
         
         deadline_layout = QHBoxLayout()
         deadline_layout.setContentsMargins(0, 0, 0, 0)
@@ -154,11 +108,7 @@ class HomeworkDetailWindow(QDialog):
         
         deadline_date = self.homework_data.get('completion_time', 'Не указан')
         deadline_text = QLabel(f"Дедлайн: {deadline_date}")
-        deadline_text.setStyleSheet("""
-            color: #2c3e50;
-            font-size: 14px;
-            font-weight: 500;
-        """)
+        deadline_text.setObjectName("deadline_text")
         deadline_info_layout.addWidget(deadline_text)
         
         deadline_layout.addLayout(deadline_info_layout)
@@ -166,11 +116,9 @@ class HomeworkDetailWindow(QDialog):
         
         days_left = self.calculate_days_left()
         days_label = QLabel(f"{days_left} дней")
-        days_label.setStyleSheet("""
-            color: #6c757d;
-            font-size: 14px;
-            font-weight: 500;
-        """)
+        days_label.setObjectName("deadline_days")
+        # цвет срока выбирает тема по свойству status
+        days_label.setProperty("status", deadline_index().status(self.homework_data)[1])
         deadline_layout.addWidget(days_label)
         
         deadline_frame.setLayout(deadline_layout)
@@ -178,23 +126,11 @@ class HomeworkDetailWindow(QDialog):
         
     def create_submission_section(self, parent_layout):
         submission_title = QLabel("Отправить на проверку")
-        submission_title.setStyleSheet("""
-            color: #2c3e50;
-            font-size: 18px;
-            font-weight: 700;
-            margin: 20px 0px 10px 0px;
-        """)
+        submission_title.setObjectName("section_title")
         parent_layout.addWidget(submission_title)
         
         submission_frame = QFrame()
-        submission_frame.setStyleSheet("""
-            QFrame {
-                background-color: white;
-                border: 2px dashed #dee2e6;
-                border-radius: 12px;
-                padding: 15px;
-            }
-        """)
+        submission_frame.setObjectName("submission_frame")
         submission_frame.setMinimumHeight(120)
         
         submission_layout = QVBoxLayout()
@@ -205,29 +141,12 @@ class HomeworkDetailWindow(QDialog):
         
         select_file_btn = QPushButton("Выбрать файл")
         select_file_btn.setFixedHeight(35)
-        select_file_btn.setStyleSheet("""
-            QPushButton {
-                background-color: #f8f9fa;
-                color: #495057;
-                border: 1px solid #dee2e6;
-                border-radius: 8px;
-                font-size: 14px;
-                font-weight: 500;
-            }
-            QPushButton:hover {
-                background-color: #e9ecef;
-                border-color: #adb5bd;
-            }
-        """)
+        select_file_btn.setObjectName("select_file_btn")
         select_file_btn.clicked.connect(self.select_file)
         file_upload_layout.addWidget(select_file_btn)
         
         self.selected_file_label = QLabel("")
-        self.selected_file_label.setStyleSheet("""
-            color: #27ae60;
-            font-size: 12px;
-            font-weight: 500;
-        """)
+        self.selected_file_label.setObjectName("selected_file_label")
         self.selected_file_label.setAlignment(Qt.AlignCenter)
         file_upload_layout.addWidget(self.selected_file_label)
         
@@ -235,25 +154,14 @@ class HomeworkDetailWindow(QDialog):
         
         separator = QFrame()
         separator.setFrameShape(QFrame.HLine)
-        separator.setStyleSheet("color: #dee2e6;")
+        separator.setObjectName("separator")
         submission_layout.addWidget(separator)
         
         self.text_input = QTextEdit()
         self.text_input.setPlaceholderText("Введите текст")
         self.text_input.setMinimumHeight(100)
         self.text_input.setMaximumHeight(250)
-        self.text_input.setStyleSheet("""
-            QTextEdit {
-                border: 1px solid #dee2e6;
-                border-radius: 8px;
-                padding: 10px;
-                font-size: 14px;
-                background-color: white;
-            }
-            QTextEdit:focus {
-                border-color: #6C59F5;
-            }
-        """)
+        self.text_input.setObjectName("answer_input")
         submission_layout.addWidget(self.text_input)
         
         submission_frame.setLayout(submission_layout)
@@ -261,71 +169,20 @@ class HomeworkDetailWindow(QDialog):
         
         submit_btn = QPushButton("Отправить")
         submit_btn.setFixedHeight(50)
-        submit_btn.setStyleSheet("""
-            QPushButton {
-                background-color: #6C59F5;
-                color: white;
-                border: none;
-                border-radius: 12px;
-                font-size: 16px;
-                font-weight: 600;
-            }
-            QPushButton:hover {
-                background-color: #5A4AE8;
-            }
-            QPushButton:pressed {
-                background-color: #4A3BD1;
-            }
-        """)
+        submit_btn.setObjectName("submit_btn")
         submit_btn.clicked.connect(self.submit_homework)
         parent_layout.addWidget(submit_btn)
         
     def calculate_days_left(self):
-        completion_time = self.homework_data.get('completion_time', '')
-        
-        if not completion_time:
-            return "Не указан"
+        days_left = deadline_index().days_left(self.homework_data)
         
-        try:
-            from datetime import datetime
-
-            date_formats = [
-                '%d.%m.%Y',
-                '%Y-%m-%d',
-                '%d/%m/%Y',
-            ]
-            
-            due_date = None
-            for fmt in date_formats:
-                try:
-                    due_date = datetime.strptime(completion_time, fmt)
-                    break
-                except ValueError:
-                    continue
-            
-            if due_date is None:
-                if '.' in completion_time:
-                    parts = completion_time.split('.')
-                    if len(parts) == 3:
-                        day, month, year = parts
-                        due_date = datetime(int(year), int(month), int(day))
-            
-            if due_date:
-                today = datetime.now()
-                days_diff = (due_date - today).days
-                
-                if days_diff > 0:
-                    return f"{days_diff} дней"
-                elif days_diff == 0:
-                    return "Сегодня"
-                else:
-                    return f"Просрочено на {abs(days_diff)} дней"
-            else:
-                return "Не указан"
-                
-        except Exception as e:
-            print(f"Ошибка парсинга даты '{completion_time}': {e}")
+        if days_left is None:
             return "Не указан"
+        if days_left > 0:
+            return f"{days_left} дней"
+        if days_left == 0:
+            return "Сегодня"
+        return f"Просрочено на {abs(days_left)} дней"
     
     
     def open_task_file(self):
@@ -350,13 +207,54 @@ class HomeworkDetailWindow(QDialog):
         filename = f"{safe_theme}{file_extension}"
         save_path = os.path.join(save_dir, filename)
         
-        success, message = self.client.download_homework_file(file_url, save_path)
+        if self.downloader is not None:
+            QMessageBox.warning(self, "Предупреждение", "Файл уже скачивается")
+            return
+        
+        self.progress_dialog = QProgressDialog(f"Скачивание: {filename}", "Отмена", 0, 0, self)
+        self.progress_dialog.setWindowTitle("Скачивание файла")
+        self.progress_dialog.setMinimumDuration(300)
+        
+        self.downloader = Worker.with_progress(self.client.download_homework_file, file_url, save_path)
+        self.downloader.signals.progress.connect(self.on_download_progress)
+        self.downloader.signals.result.connect(self.on_download_finished)
+        self.downloader.signals.error.connect(lambda error: self.on_download_finished((False, error)))
+        self.progress_dialog.canceled.connect(self.downloader.cancel)
+        self.downloader.start(self)
+    
+    def on_download_progress(self, values):
+        if self.progress_dialog is None:
+            return
+        done, total = values
+        if total:
+            # QProgressDialog принимает int, поэтому прогресс в килобайтах
+            self.progress_dialog.setMaximum(max(total // 1024, 1))
+            self.progress_dialog.setValue(min(done // 1024, total // 1024))
+        
+    def on_download_finished(self, result):
+        success, message = result
+        cancelled = self.downloader.is_cancelled()
+        self.downloader = None
+        self.close_progress_dialog()
         
         if success:
             QMessageBox.information(self, "Успех", message)
-        else:
+        elif not cancelled:
             QMessageBox.critical(self, "Ошибка", message)
     
+    def done(self, result):
+        # сюда приходят и крестик (closeEvent -> reject), и Esc (reject), и accept
+        # недокачанный .part останется, следующее скачивание продолжит с него
+        # задача в пуле завершится сама, как только заметит отмену
+        if self.downloader is not None:
+            self.downloader.detach()
+        if self.submitter is not None:
+            # отправка через очередь доработает в фоне, ее итог главное окно получит через on_change очереди
+            self.submitter.detach(cancel=self.outbox is None)
+        self.downloader = self.submitter = None
+        self.close_progress_dialog()
+        super().done(result)
+    
     def get_file_extension(self, url):
         """Определяет расширение файла по URL"""
         try:
@@ -395,44 +293,61 @@ class HomeworkDetailWindow(QDialog):
             QMessageBox.warning(self, "Ошибка", "ID задания не найден")
             return
         
-        try:
-            file_url = None
-            answer_text = self.text_input.toPlainText().strip() or None
-            
-            success, message = self.client.check_token_validity()
-            if not success:
-                QMessageBox.critical(self, "Ошибка авторизации", f"Токен недействителен: {message}")
+        if self.submitter is not None or self.downloader is not None:
+            return
+        
+        answer_text = self.text_input.toPlainText().strip() or None
+        if self.outbox is not None:
+            # первая попытка сразу и с прогрессом; при ошибке сети запись останется в очереди и уйдет с повтором
+            try:
+                item = self.outbox.enqueue(homework_id, self.selected_file_path, answer_text, claim=True)
+            except Exception as e:
+                QMessageBox.critical(self, "Ошибка", f"Не удалось поставить задание в очередь: {str(e)}")
                 return
-            
-            if self.selected_file_path:
-                success, token_data = self.client.get_file_token()
-                if not success:
-                    QMessageBox.critical(self, "Ошибка", f"Не удалось получить create-token: {token_data}")
-                    return
-                
-                file_token = token_data.get('token', '')
-                homework_dir_id = token_data.get('homework_dir_id', '')
-                
-                if not file_token or not homework_dir_id:
-                    QMessageBox.critical(self, "Ошибка", "Create-token или директория пусты")
-                    return
-                
-                success, result = self.client.upload_file_to_storage(self.selected_file_path, file_token, homework_dir_id)
-                if not success:
-                    QMessageBox.critical(self, "Ошибка", f"Не удалось загрузить файл: {result}")
-                    return
-                
-                file_url = result
-                print(f"Получен URL файла: {file_url}")
-            
-            success, message = self.client.submit_homework(homework_id, file_url, answer_text)
-            
-            if success:
-                QMessageBox.information(self, "Успех", message)
-                self.homework_submitted.emit(self.homework_data)
-                self.close()
-            else:
-                QMessageBox.critical(self, "Ошибка", message)
-                
-        except Exception as e:
-            QMessageBox.critical(self, "Ошибка", f"Произошла ошибка: {str(e)}")
+            submitter = Worker.with_progress(self.outbox.process, item,
+                                             detached=lambda: submitter.is_detached())
+            self.submitter = submitter
+        else:
+            self.submitter = Worker.with_progress(self.client.submit_pipeline, homework_id,
+                                                  self.selected_file_path, answer_text)
+        self.submitter.signals.result.connect(self.on_submit_finished)
+        self.submitter.signals.error.connect(
+            lambda error: self.on_submit_finished((False, f"Произошла ошибка: {error}")))
+        
+        if self.selected_file_path:
+            self.progress_dialog = QProgressDialog(
+                f"Загрузка: {os.path.basename(self.selected_file_path)}", "Отмена", 0, 0, self)
+            self.progress_dialog.setWindowTitle("Отправка задания")
+            self.progress_dialog.setMinimumDuration(300)
+            self.progress_dialog.canceled.connect(self.submitter.cancel)
+            self.submitter.signals.progress.connect(self.on_upload_progress)
+        self.submitter.start(self)
+    
+    def on_upload_progress(self, values):
+        if self.progress_dialog is None:
+            return
+        sent, total, speed = values
+        self.progress_dialog.setMaximum(max(total // 1024, 1))
+        self.progress_dialog.setValue(min(sent // 1024, total // 1024))
+        self.progress_dialog.setLabelText(
+            f"Загрузка: {os.path.basename(self.selected_file_path or '')}\n"
+            f"{sent / 1048576:.1f} из {total / 1048576:.1f} МБ, {speed / 1048576:.1f} МБ/с")
+        
+    def close_progress_dialog(self):
+        if self.progress_dialog is not None:
+            self.progress_dialog.canceled.disconnect()
+            self.progress_dialog.close()
+            self.progress_dialog = None
+    
+    def on_submit_finished(self, result):
+        success, message = result
+        cancelled = self.submitter.is_cancelled()
+        self.submitter = None
+        self.close_progress_dialog()
+        
+        if success:
+            QMessageBox.information(self, "Успех", message)
+            self.homework_submitted.emit(self.homework_data)
+            self.close()
+        elif not cancelled:
+            QMessageBox.critical(self, "Ошибка", message)
@@ -0,0 +1,191 @@
+# список заданий model/view: карточки рисует делегат и только для видимых строк,
+# виджетов на каждое задание не создается
+
+from PyQt5.QtWidgets import QListView, QStyledItemDelegate, QStyle, QAbstractItemView
+from PyQt5.QtCore import Qt, QAbstractListModel, QModelIndex, QRect, QRectF, QSize, QSortFilterProxyModel
+from PyQt5.QtGui import QColor, QFont, QFontMetrics, QPainter, QPen
+
+from .theme import PRIMARY, TEXT, MUTED, BORDER, STATUS_COLORS
+from .deadlines import deadline_index
+
+HomeworkRole = Qt.UserRole
+StatusRole = Qt.UserRole + 1
+
+CARD_HEIGHT = 140
+CARD_SPACING = 15
+CARD_PADDING = 15
+COLUMNS = 4
+
+def subject_of(homework):
+    return homework.get('name_spec', 'Не указан')
+
+class HomeworkListModel(QAbstractListModel):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.records = []
+        # индекс предметов: предмет каждой строки и строки каждого предмета
+        self.row_subjects = []
+        self.subject_rows = {}
+        # статус срока берется из общего индекса сроков; с наступлением нового дня карточки перерисовываются
+        self.deadlines = deadline_index()
+        self.deadlines.day_changed.connect(self.on_day_changed)
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.records)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        homework = self.records[index.row()]
+        if role == Qt.DisplayRole:
+            return homework.get('theme', 'Без темы')
+        if role == HomeworkRole:
+            return homework
+        if role == StatusRole:
+            return self.deadlines.status(homework)
+        return None
+
+    def _index_records(self, records):
+        for homework in records:
+            subject = subject_of(homework)
+            self.subject_rows.setdefault(subject, []).append(len(self.row_subjects))
+            self.row_subjects.append(subject)
+
+    def set_records(self, records):
+        self.beginResetModel()
+        self.records = list(records)
+        self.row_subjects = []
+        self.subject_rows = {}
+        self._index_records(self.records)
+        self.endResetModel()
+
+    def append_records(self, records):
+        if not records:
+            return
+        start = len(self.records)
+        self.beginInsertRows(QModelIndex(), start, start + len(records) - 1)
+        self.records.extend(records)
+        # индекс обновляется до endInsertRows - прокси фильтрует новые строки уже по нему
+        self._index_records(records)
+        self.endInsertRows()
+
+    def on_day_changed(self):
+        if self.records:
+            self.dataChanged.emit(self.index(0), self.index(len(self.records) - 1), [StatusRole])
+
+    def subject_counts(self):
+        return {subject: len(rows) for subject, rows in self.subject_rows.items()}
+
+class SubjectFilterProxy(QSortFilterProxyModel):
+    # фильтр по предмету: строка проверяется по индексу модели, записи заданий не читаются
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.subject = None
+
+    def set_subject(self, subject):
+        if subject != self.subject:
+            self.subject = subject
+            self.invalidateFilter()
+
+    def filterAcceptsRow(self, source_row, source_parent):
+        return self.subject is None or self.sourceModel().row_subjects[source_row] == self.subject
+
+class HomeworkCardDelegate(QStyledItemDelegate):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.card_size = QSize(250, CARD_HEIGHT)
+        self.type_font = self._font(11, QFont.Medium)
+        self.subject_font = self._font(14, QFont.DemiBold)
+        self.theme_font = self._font(13, QFont.Medium)
+        self.date_font = self._font(12)
+        self.status_font = self._font(12, QFont.DemiBold)
+        self.badge_font = self._font(10, QFont.DemiBold)
+
+    @staticmethod
+    def _font(pixel_size, weight=QFont.Normal):
+        font = QFont('Segoe UI')
+        font.setPixelSize(pixel_size)
+        font.setWeight(weight)
+        return font
+
+    def sizeHint(self, option, index):
+        return self.card_size
+
+    def paint(self, painter, option, index):
+        homework = index.data(HomeworkRole)
+        status_text, status = index.data(StatusRole)
+        hovered = bool(option.state & QStyle.State_MouseOver)
+
+        painter.save()
+        painter.setRenderHint(QPainter.Antialiasing)
+        card = QRectF(option.rect).adjusted(5.5, 5.5, -5.5, -5.5)
+        painter.setPen(QPen(QColor(PRIMARY if hovered else BORDER), 1))
+        painter.setBrush(QColor("#f8f9fa" if hovered else "white"))
+        painter.drawRoundedRect(card, 12, 12)
+
+        rect = option.rect.adjusted(CARD_PADDING, CARD_PADDING, -CARD_PADDING, -CARD_PADDING)
+        y = rect.top()
+        y = self._draw_line(painter, rect, y, "САМОСТОЯТЕЛЬНАЯ РАБОТА", self.type_font, MUTED)
+        y = self._draw_line(painter, rect, y, homework.get('name_spec', 'Не указан'), self.subject_font, TEXT)
+
+        painter.setFont(self.theme_font)
+        painter.setPen(QColor(TEXT))
+        theme_rect = QRect(rect.left(), y, rect.width(), QFontMetrics(self.theme_font).lineSpacing() * 2)
+        painter.drawText(theme_rect, Qt.AlignLeft | Qt.AlignTop | Qt.TextWordWrap, homework.get('theme', 'Без темы'))
+        y = theme_rect.bottom() + 8
+
+        date_text = homework.get('completion_time', '') or 'Не указан'
+        painter.setFont(self.date_font)
+        painter.setPen(QColor(MUTED))
+        painter.drawText(QRect(rect.left(), y, rect.width(), rect.bottom() - y), Qt.AlignLeft | Qt.AlignTop, date_text)
+        status_left = rect.left() + QFontMetrics(self.date_font).horizontalAdvance(date_text) + 10
+        status_rect = QRect(status_left, y, max(rect.right() - status_left, 0), rect.bottom() - y)
+        self._draw_text(painter, status_rect, status_text, self.status_font, STATUS_COLORS[status])
+
+        if homework.get('has_comments', False):
+            badge = QRectF(rect.right() - 20, rect.top(), 20, 16)
+            painter.setPen(Qt.NoPen)
+            painter.setBrush(QColor(PRIMARY))
+            painter.drawRoundedRect(badge, 8, 8)
+            painter.setFont(self.badge_font)
+            painter.setPen(QColor("white"))
+            painter.drawText(badge, Qt.AlignCenter, "1")
+        painter.restore()
+
+    def _draw_text(self, painter, rect, text, font, color):
+        painter.setFont(font)
+        painter.setPen(QColor(color))
+        text = QFontMetrics(font).elidedText(str(text), Qt.ElideRight, rect.width())
+        painter.drawText(rect, Qt.AlignLeft | Qt.AlignTop, text)
+
+    def _draw_line(self, painter, rect, y, text, font, color):
+        # одна строка с многоточием; возвращает y следующей строки
+        height = QFontMetrics(font).lineSpacing()
+        self._draw_text(painter, QRect(rect.left(), y, rect.width(), height), text, font, color)
+        return y + height + 8
+
+class HomeworkListView(QListView):
+    # сетка из COLUMNS карточек: ширина карточки пересчитывается под ширину окна
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.delegate = HomeworkCardDelegate(self)
+        self.setItemDelegate(self.delegate)
+        self.setViewMode(QListView.IconMode)
+        self.setFlow(QListView.LeftToRight)
+        self.setWrapping(True)
+        self.setResizeMode(QListView.Adjust)
+        self.setMovement(QListView.Static)
+        self.setUniformItemSizes(True)
+        self.setSelectionMode(QAbstractItemView.NoSelection)
+        self.setVerticalScrollMode(QAbstractItemView.ScrollPerPixel)
+        self.verticalScrollBar().setSingleStep(20)
+        self.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        self.setMouseTracking(True)
+        self.viewport().setCursor(Qt.PointingHandCursor)
+        self.setObjectName("homework_list")
+
+    def resizeEvent(self, event):
+        width = max((self.viewport().width() - 1) // COLUMNS, 1)
+        self.delegate.card_size = QSize(width, CARD_HEIGHT)
+        self.setGridSize(QSize(width, CARD_HEIGHT + CARD_SPACING))
+        super().resizeEvent(event)
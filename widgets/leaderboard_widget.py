@@ -1,4 +1,6 @@
-from PyQt5.QtWidgets import QWidget, QVBoxLayout, QLabel, QTableWidget, QTableWidgetItem
+from PyQt5.QtWidgets import QWidget, QVBoxLayout, QLabel
+
+from .data_table import DataTable
 
 class LeaderboardWidget(QWidget):
     def __init__(self, client):
@@ -12,12 +14,7 @@ class LeaderboardWidget(QWidget):
         layout.setSpacing(15)
         
         title = QLabel("Таблица лидеров")
-        title.setStyleSheet("""
-            font-size: 24px; 
-            font-weight: 700; 
-            color: #2c3e50;
-            padding: 20px 0px;
-        """)
+        title.setObjectName("page_title")
         layout.addWidget(title)
         
         self.table = self.create_leaderboard_table()
@@ -26,37 +23,9 @@ class LeaderboardWidget(QWidget):
         self.setLayout(layout)
         
     def create_leaderboard_table(self):
-        table = QTableWidget()
-        table.setColumnCount(3)
-        table.setHorizontalHeaderLabels(["Место", "Имя", "Баллы"])
-        table.setRowCount(0)
-        table.horizontalHeader().setStretchLastSection(True)
+        table = DataTable(["Место", "Имя", "Баллы"])
         
-        table.setStyleSheet("""
-            QTableWidget {
-                background-color: white;
-                border: 1px solid #e1e8ed;
-                border-radius: 8px;
-                gridline-color: #ecf0f1;
-                selection-background-color: #6C59F5;
-            }
-            QTableWidget::item {
-                padding: 12px;
-                border-bottom: 1px solid #ecf0f1;
-            }
-            QTableWidget::item:selected {
-                background-color: #6C59F5;
-                color: white;
-            }
-            QHeaderView::section {
-                background-color: #6C59F5;
-                color: white;
-                padding: 12px;
-                border: none;
-                font-weight: 600;
-                font-size: 13px;
-            }
-        """)
+        table.setObjectName("data_table")
         
         return table
     
@@ -64,15 +33,10 @@ class LeaderboardWidget(QWidget):
         if not leaderboard_data or not self.table:
             return
         
-        self.table.setRowCount(0)
-        
+        rows = []
         if isinstance(leaderboard_data, dict) and "group" in leaderboard_data and "top" in leaderboard_data["group"]:
-            for i, leader in enumerate(leaderboard_data["group"]["top"]):
-                self.table.insertRow(i)
-                
-                self.table.setItem(i, 0, QTableWidgetItem(str(leader.get('position', ''))))
-                self.table.setItem(i, 1, QTableWidgetItem(str(leader.get('fio_stud', '-'))))
-                self.table.setItem(i, 2, QTableWidgetItem(str(leader.get('amount', 0))))
+            rows = [(leader.get('position', ''), leader.get('fio_stud', '-'), leader.get('amount', 0))
+                    for leader in leaderboard_data["group"]["top"]]
         
-        self.table.resizeColumnsToContents()
+        self.table.set_rows(rows)
         
@@ -1,4 +1,6 @@
-from PyQt5.QtWidgets import QWidget, QVBoxLayout, QLabel, QTableWidget, QTableWidgetItem
+from PyQt5.QtWidgets import QWidget, QVBoxLayout, QLabel
+
+from .data_table import DataTable
 
 class ScheduleWidget(QWidget):
     def __init__(self, client):
@@ -12,12 +14,7 @@ class ScheduleWidget(QWidget):
         layout.setSpacing(15)
         
         title = QLabel("Расписание")
-        title.setStyleSheet("""
-            font-size: 24px; 
-            font-weight: 700; 
-            color: #2c3e50;
-            padding: 20px 0px;
-        """)
+        title.setObjectName("page_title")
         layout.addWidget(title)
         
         self.table = self.create_schedule_table()
@@ -26,37 +23,9 @@ class ScheduleWidget(QWidget):
         self.setLayout(layout)
         
     def create_schedule_table(self):
-        table = QTableWidget()
-        table.setColumnCount(4)
-        table.setHorizontalHeaderLabels(["Время", "Предмет", "Преподаватель", "Аудитория"])
-        table.setRowCount(0)
-        table.horizontalHeader().setStretchLastSection(True)
+        table = DataTable(["Время", "Предмет", "Преподаватель", "Аудитория"])
         
-        table.setStyleSheet("""
-            QTableWidget {
-                background-color: white;
-                border: 1px solid #e1e8ed;
-                border-radius: 8px;
-                gridline-color: #ecf0f1;
-                selection-background-color: #6C59F5;
-            }
-            QTableWidget::item {
-                padding: 12px;
-                border-bottom: 1px solid #ecf0f1;
-            }
-            QTableWidget::item:selected {
-                background-color: #6C59F5;
-                color: white;
-            }
-            QHeaderView::section {
-                background-color: #6C59F5;
-                color: white;
-                padding: 12px;
-                border: none;
-                font-weight: 600;
-                font-size: 13px;
-            }
-        """)
+        table.setObjectName("data_table")
         
         return table
     
@@ -64,20 +33,14 @@ class ScheduleWidget(QWidget):
         if not schedule_data or not self.table:
             return
         
-        self.table.setRowCount(0)
-        
+        rows = []
         if isinstance(schedule_data, list):
-            for i, schedule in enumerate(schedule_data):
-                self.table.insertRow(i)
-                
+            for schedule in schedule_data:
                 started_at = schedule.get('started_at', '')
                 finished_at = schedule.get('finished_at', '')
                 time_str = f"{started_at} - {finished_at}" if started_at and finished_at else ""
                 
-                self.table.setItem(i, 0, QTableWidgetItem(str(time_str)))
-                self.table.setItem(i, 1, QTableWidgetItem(str(schedule.get('subject_name', ''))))
-                self.table.setItem(i, 2, QTableWidgetItem(str(schedule.get('teacher_name', ''))))
-                self.table.setItem(i, 3, QTableWidgetItem(""))
+                rows.append((time_str, schedule.get('subject_name', ''), schedule.get('teacher_name', ''), ""))
         
-        self.table.resizeColumnsToContents()
+        self.table.set_rows(rows)
         
@@ -0,0 +1,603 @@
+# тема приложения: одна таблица стилей на весь QApplication, разбирается Qt один раз;
+# виджеты выбираются по objectName и динамическим свойствам, а не своими setStyleSheet
+
+PRIMARY = "#6C59F5"
+PRIMARY_HOVER = "#5A4AE8"
+PRIMARY_PRESSED = "#4A3BD1"
+TEXT = "#2c3e50"
+MUTED = "#7f8c8d"
+BORDER = "#e1e8ed"
+
+# цвета сроков сдачи: статус задается свойством status, цвет выбирает таблица стилей
+STATUS_COLORS = {
+    'overdue': "#F75325",
+    'today': "#f39c12",
+    'ok': "#27ae60",
+    'unknown': MUTED,
+}
+
+# акцентные цвета карточек-счетчиков дашборда (свойство accent)
+ACCENT_COLORS = {
+    'primary': PRIMARY,
+    'danger': "#F75325",
+    'success': "#27ae60",
+    'warning': "#f39c12",
+}
+
+def _property_rules(selector, name, colors):
+    return "".join(f'{selector}[{name}="{key}"] {{ color: {color}; }}\n' for key, color in colors.items())
+
+STYLESHEET = """
+/* окно входа */
+QWidget#login_window, QWidget#login_window QWidget {
+    background-color: white;
+    color: #333;
+    font-family: 'Segoe UI', Arial, sans-serif;
+}
+QWidget#login_window QLineEdit {
+    background-color: white;
+    border: 2px solid #ddd;
+    border-radius: 8px;
+    padding: 12px 16px;
+    font-size: 14px;
+    color: #333;
+    min-height: 20px;
+}
+QWidget#login_window QLineEdit:focus {
+    border: 2px solid %(primary)s;
+    background-color: white;
+}
+QWidget#login_window QPushButton {
+    background-color: %(primary)s;
+    color: white;
+    border: none;
+    border-radius: 8px;
+    padding: 12px 24px;
+    font-size: 14px;
+    font-weight: bold;
+}
+QWidget#login_window QPushButton:hover {
+    background-color: %(primary_hover)s;
+}
+QWidget#login_window QPushButton:pressed {
+    background-color: %(primary_pressed)s;
+}
+QWidget#login_window QPushButton:disabled {
+    background-color: #b3aaf9;
+}
+QWidget#login_window QPushButton#toggle_password_btn {
+    background-color: #f8f9fa;
+    border: 2px solid #ddd;
+    border-radius: 8px;
+    font-size: 14px;
+    font-weight: normal;
+    color: #666;
+    padding: 8px 16px;
+}
+QWidget#login_window QPushButton#toggle_password_btn:hover {
+    background-color: #e9ecef;
+    color: #333;
+}
+QWidget#login_window QPushButton#toggle_password_btn:pressed {
+    background-color: #dee2e6;
+}
+QWidget#login_window QCheckBox#remember_checkbox {
+    font-size: 14px;
+    color: #666;
+}
+QWidget#login_window QLabel#login_title {
+    font-size: 32px;
+    font-weight: bold;
+    color: %(text)s;
+    margin-bottom: 10px;
+}
+
+/* главное окно и меню */
+QMainWindow#main_window {
+    background: qlineargradient(x1:0, y1:0, x2:0, y2:1,
+        stop:0 #f8f9fa, stop:1 #e9ecef);
+    font-family: 'Segoe UI', Arial, sans-serif;
+}
+QStackedWidget#content_area {
+    background: qlineargradient(x1:0, y1:0, x2:0, y2:1,
+        stop:0 #f8f9fa, stop:1 #e9ecef);
+    border-radius: 8px;
+}
+QFrame#sidebar {
+    background: qlineargradient(x1:0, y1:0, x2:1, y2:0,
+        stop:0 #2c3e50, stop:1 #34495e);
+    border: none;
+    border-right: 2px solid #34495e;
+}
+QPushButton[sidebar="true"] {
+    background-color: transparent;
+    border: none;
+    text-align: left;
+    padding: 15px 20px;
+    color: #ecf0f1;
+    font-size: 15px;
+    font-weight: 600;
+    border-radius: 8px;
+    margin: 2px 0px;
+}
+QPushButton[sidebar="true"]:hover {
+    background-color: rgba(255, 255, 255, 0.15);
+    color: white;
+}
+QPushButton[sidebar="true"]:checked {
+    background: qlineargradient(x1:0, y1:0, x2:1, y2:0,
+        stop:0 %(primary)s, stop:1 %(primary_hover)s);
+    color: white;
+}
+QPushButton#logout_btn {
+    background-color: #e74c3c;
+    color: white;
+    border: none;
+    border-radius: 8px;
+    font-size: 14px;
+    font-weight: 600;
+}
+QPushButton#logout_btn:hover {
+    background-color: #c0392b;
+}
+
+/* заголовки вкладок */
+QLabel#page_title {
+    font-size: 24px;
+    font-weight: 700;
+    color: %(text)s;
+    padding: 20px 0px;
+}
+QLabel#calendar_title {
+    font-size: 28px;
+    font-weight: 700;
+    color: %(text)s;
+    padding: 10px 0px;
+    margin-bottom: 10px;
+}
+
+/* дашборд */
+QLabel#welcome_label {
+    font-size: 28px;
+    font-weight: 700;
+    color: %(text)s;
+    padding: 10px 0px;
+}
+QPushButton#refresh_btn {
+    background-color: %(primary)s;
+    color: white;
+    border: none;
+    border-radius: 8px;
+    padding: 10px 20px;
+    font-weight: 600;
+    font-size: 14px;
+}
+QPushButton#refresh_btn:hover {
+    background-color: %(primary_hover)s;
+}
+QFrame#card {
+    background: qlineargradient(x1:0, y1:0, x2:0, y2:1,
+        stop:0 #ffffff, stop:1 #f8f9fa);
+    border: 2px solid %(border)s;
+    border-radius: 12px;
+}
+QFrame#card[card_type="stat"]:hover {
+    border: 2px solid %(primary)s;
+}
+QLabel#card_title {
+    font-size: 16px;
+    font-weight: 700;
+    color: %(text)s;
+    padding: 0px;
+    margin-bottom: 5px;
+}
+QLabel#stat_value {
+    font-size: 48px;
+    font-weight: 800;
+}
+%(stat_colors)s
+QLabel#stat_subtitle {
+    font-size: 12px;
+    color: %(muted)s;
+    font-weight: 500;
+}
+QFrame#mini_calendar_card {
+    background: white;
+    border: 1px solid %(border)s;
+    border-radius: 8px;
+}
+QCalendarWidget#mini_calendar {
+    background: white;
+    border: none;
+    border-radius: 6px;
+}
+QCalendarWidget#mini_calendar QWidget#qt_calendar_navigationbar {
+    background: #3498db;
+    border-radius: 6px 6px 0px 0px;
+}
+QCalendarWidget#mini_calendar QToolButton {
+    background: transparent;
+    color: white;
+    font-size: 11px;
+    padding: 4px;
+    border: none;
+}
+QCalendarWidget#mini_calendar QSpinBox {
+    background: transparent;
+    color: white;
+    font-size: 12px;
+    border: none;
+}
+QCalendarWidget#mini_calendar QAbstractItemView:item {
+    padding: 4px;
+    border: none;
+}
+QCalendarWidget#mini_calendar QAbstractItemView:item:selected {
+    background: #3498db;
+    color: white;
+    border-radius: 3px;
+}
+
+/* таблицы: data_table - вкладки, dashboard_table - карточки дашборда */
+QTableView#data_table, QTableView#dashboard_table {
+    background-color: white;
+    border: 1px solid %(border)s;
+    border-radius: 8px;
+    gridline-color: #ecf0f1;
+    selection-background-color: %(primary)s;
+}
+QTableView#dashboard_table {
+    selection-background-color: #3498db;
+}
+QTableView#data_table::item {
+    padding: 12px;
+    border-bottom: 1px solid #ecf0f1;
+}
+QTableView#dashboard_table::item {
+    padding: 10px;
+    border-bottom: 1px solid #ecf0f1;
+    font-size: 13px;
+}
+QTableView#data_table::item:selected, QTableView#dashboard_table::item:selected {
+    background-color: %(primary)s;
+    color: white;
+}
+QTableView#data_table QHeaderView::section {
+    background-color: %(primary)s;
+    color: white;
+    padding: 12px;
+    border: none;
+    font-weight: 600;
+    font-size: 13px;
+}
+QTableView#dashboard_table QHeaderView::section {
+    background-color: #f8f9fa;
+    color: %(text)s;
+    padding: 10px;
+    border: none;
+    font-weight: 600;
+    font-size: 13px;
+}
+QLineEdit#filter_input {
+    background-color: white;
+    border: 1px solid %(border)s;
+    border-radius: 8px;
+    padding: 8px 12px;
+    font-size: 14px;
+    color: %(text)s;
+}
+QLineEdit#filter_input:focus {
+    border-color: %(primary)s;
+}
+
+/* задания */
+QComboBox#subject_filter {
+    background-color: white;
+    border: 1px solid %(border)s;
+    border-radius: 8px;
+    padding: 8px 12px;
+    font-size: 14px;
+    min-width: 150px;
+    color: %(text)s;
+}
+QComboBox#subject_filter:hover {
+    background-color: white;
+    border-color: %(primary)s;
+    color: %(text)s;
+}
+QComboBox#subject_filter::drop-down {
+    border: none;
+    width: 20px;
+}
+QComboBox#subject_filter::down-arrow {
+    image: none;
+    border-left: 5px solid transparent;
+    border-right: 5px solid transparent;
+    border-top: 5px solid %(muted)s;
+    margin-right: 5px;
+}
+QComboBox#subject_filter QAbstractItemView {
+    background-color: white;
+    border: 1px solid %(border)s;
+    border-radius: 8px;
+    selection-background-color: %(primary)s;
+    color: %(text)s;
+}
+QComboBox#subject_filter QAbstractItemView::item {
+    color: %(text)s;
+    padding: 8px 12px;
+    background-color: white;
+}
+QComboBox#subject_filter QAbstractItemView::item:hover {
+    background-color: #f8f9fa;
+    color: %(text)s;
+}
+QComboBox#subject_filter QAbstractItemView::item:selected {
+    background-color: %(primary)s;
+    color: white;
+}
+QLabel#task_count_label {
+    font-size: 16px;
+    color: %(muted)s;
+    font-weight: 500;
+}
+QListView#homework_list {
+    border: none;
+    background-color: transparent;
+}
+
+/* окно задания */
+QPushButton#close_btn {
+    background-color: #f8f9fa;
+    border: 1px solid %(border)s;
+    border-radius: 15px;
+    font-size: 14px;
+    color: #6c757d;
+}
+QPushButton#close_btn:hover {
+    background-color: #e9ecef;
+    color: #495057;
+}
+QScrollArea#detail_scroll {
+    border: none;
+    background-color: transparent;
+}
+QLabel#detail_meta {
+    color: #6c757d;
+    font-size: 14px;
+    font-weight: 500;
+}
+QLabel#detail_title {
+    color: %(text)s;
+    font-size: 24px;
+    font-weight: 700;
+    margin: 10px 0px;
+}
+QPushButton#open_task_btn, QPushButton#submit_btn {
+    background-color: %(primary)s;
+    color: white;
+    border: none;
+    border-radius: 12px;
+    font-size: 16px;
+    font-weight: 600;
+}
+QPushButton#open_task_btn {
+    padding: 0px 20px;
+}
+QPushButton#open_task_btn:hover, QPushButton#submit_btn:hover {
+    background-color: %(primary_hover)s;
+}
+QPushButton#open_task_btn:pressed, QPushButton#submit_btn:pressed {
+    background-color: %(primary_pressed)s;
+}
+QFrame#deadline_frame {
+    background-color: #f8f9fa;
+    border: 1px solid #e9ecef;
+    border-radius: 12px;
+    padding: 15px;
+}
+QLabel#deadline_text {
+    color: %(text)s;
+    font-size: 14px;
+    font-weight: 500;
+}
+QLabel#deadline_days {
+    color: #6c757d;
+    font-size: 14px;
+    font-weight: 500;
+}
+%(deadline_colors)s
+QLabel#section_title {
+    color: %(text)s;
+    font-size: 18px;
+    font-weight: 700;
+    margin: 20px 0px 10px 0px;
+}
+QFrame#submission_frame {
+    background-color: white;
+    border: 2px dashed #dee2e6;
+    border-radius: 12px;
+    padding: 15px;
+}
+QPushButton#select_file_btn {
+    background-color: #f8f9fa;
+    color: #495057;
+    border: 1px solid #dee2e6;
+    border-radius: 8px;
+    font-size: 14px;
+    font-weight: 500;
+}
+QPushButton#select_file_btn:hover {
+    background-color: #e9ecef;
+    border-color: #adb5bd;
+}
+QLabel#selected_file_label {
+    color: #27ae60;
+    font-size: 12px;
+    font-weight: 500;
+}
+QFrame#separator {
+    color: #dee2e6;
+}
+QTextEdit#answer_input {
+    border: 1px solid #dee2e6;
+    border-radius: 8px;
+    padding: 10px;
+    font-size: 14px;
+    background-color: white;
+}
+QTextEdit#answer_input:focus {
+    border-color: %(primary)s;
+}
+
+/* календарь */
+QFrame#calendar_frame, QFrame#events_frame {
+    background-color: white;
+    border: 1px solid %(border)s;
+    border-radius: 12px;
+    padding: 20px;
+}
+QCalendarWidget#calendar {
+    background-color: white;
+    border: 1px solid %(border)s;
+    border-radius: 8px;
+}
+QCalendarWidget#calendar QWidget {
+    alternate-background-color: #f8f9fa;
+}
+QCalendarWidget#calendar QAbstractItemView:enabled {
+    background-color: white;
+    selection-background-color: %(primary)s;
+    selection-color: white;
+}
+QCalendarWidget#calendar QAbstractItemView:disabled {
+    color: #bdc3c7;
+}
+QCalendarWidget#calendar QWidget#qt_calendar_navigationbar {
+    background-color: %(primary)s;
+    border-radius: 8px 8px 0px 0px;
+}
+QCalendarWidget#calendar QToolButton {
+    background-color: transparent;
+    color: white;
+    font-weight: bold;
+    font-size: 14px;
+    padding: 8px;
+    border: none;
+}
+QCalendarWidget#calendar QToolButton:hover {
+    background-color: rgba(255, 255, 255, 0.2);
+    border-radius: 4px;
+}
+QCalendarWidget#calendar QToolButton:pressed {
+    background-color: rgba(255, 255, 255, 0.3);
+}
+QCalendarWidget#calendar QSpinBox {
+    background-color: transparent;
+    color: white;
+    font-weight: bold;
+    font-size: 16px;
+    border: none;
+    padding: 4px;
+}
+QCalendarWidget#calendar QSpinBox::up-button, QCalendarWidget#calendar QSpinBox::down-button {
+    background-color: transparent;
+    border: none;
+    width: 0px;
+}
+QCalendarWidget#calendar QWidget#qt_calendar_calendarview {
+    background-color: white;
+}
+QCalendarWidget#calendar QAbstractItemView {
+    selection-background-color: %(primary)s;
+    selection-color: white;
+    border: none;
+}
+QCalendarWidget#calendar QAbstractItemView:item {
+    padding: 8px;
+    border: none;
+}
+QCalendarWidget#calendar QAbstractItemView:item:selected {
+    background-color: %(primary)s;
+    color: white;
+    border-radius: 4px;
+}
+QCalendarWidget#calendar QAbstractItemView:item:hover {
+    background-color: #ecf0f1;
+    border-radius: 4px;
+}
+QPushButton#today_btn {
+    background-color: %(primary)s;
+    color: white;
+    border: none;
+    border-radius: 6px;
+    padding: 8px 16px;
+    font-weight: 600;
+    font-size: 12px;
+}
+QPushButton#today_btn:hover {
+    background-color: %(primary_hover)s;
+}
+QPushButton#week_btn {
+    background-color: #ecf0f1;
+    color: %(text)s;
+    border: none;
+    border-radius: 6px;
+    padding: 8px 12px;
+    font-weight: 600;
+    font-size: 12px;
+}
+QPushButton#week_btn:hover {
+    background-color: #bdc3c7;
+}
+QLabel#events_title {
+    font-size: 18px;
+    font-weight: 600;
+    color: %(text)s;
+    padding: 5px 0px;
+}
+QLabel#selected_date_label {
+    font-size: 14px;
+    color: %(muted)s;
+    padding: 5px 0px;
+}
+QListWidget#events_list {
+    background-color: #f8f9fa;
+    border: 1px solid %(border)s;
+    border-radius: 8px;
+    padding: 10px;
+}
+QListWidget#events_list::item {
+    background-color: white;
+    border: 1px solid %(border)s;
+    border-radius: 6px;
+    padding: 12px;
+    margin: 4px 0px;
+}
+QListWidget#events_list::item:hover {
+    background-color: #ecf0f1;
+    border-color: %(primary)s;
+}
+QListWidget#events_list::item:selected {
+    background-color: %(primary)s;
+    color: white;
+    border-color: %(primary_hover)s;
+}
+QLabel#events_stats_label {
+    font-size: 12px;
+    color: %(muted)s;
+    padding: 10px 0px;
+}
+""" % {
+    'primary': PRIMARY,
+    'primary_hover': PRIMARY_HOVER,
+    'primary_pressed': PRIMARY_PRESSED,
+    'text': TEXT,
+    'muted': MUTED,
+    'border': BORDER,
+    'stat_colors': _property_rules('QLabel#stat_value', 'accent', ACCENT_COLORS),
+    'deadline_colors': _property_rules('QLabel#deadline_days', 'status', STATUS_COLORS),
+}
+
+def apply_theme(app):
+    app.setStyleSheet(STYLESHEET)
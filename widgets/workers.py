@@ -0,0 +1,103 @@
+# фоновые задачи на QThreadPool: запросы клиента идут вне GUI-потока,
+# результат, ошибка и прогресс возвращаются в GUI-поток сигналами
+
+from PyQt5.QtCore import Qt, QObject, QRunnable, QThreadPool, pyqtSignal
+
+# запущенные задачи: без ссылки Python удалит объект сигналов раньше, чем они дойдут до GUI-потока
+_running = set()
+
+def set_loading(widget, loading):
+    # у виджета может идти несколько задач сразу - занятый курсор виден, пока не завершится последняя
+    jobs = max((widget.property('loading_jobs') or 0) + (1 if loading else -1), 0)
+    widget.setProperty('loading_jobs', jobs)
+    if jobs:
+        widget.setCursor(Qt.BusyCursor)
+    else:
+        widget.unsetCursor()
+
+class WorkerSignals(QObject):
+    result = pyqtSignal(object)
+    error = pyqtSignal(str)
+    progress = pyqtSignal(object)
+    finished = pyqtSignal()
+
+class Worker(QRunnable):
+    def __init__(self, fn, *args, **kwargs):
+        super().__init__()
+        # объект живет до сигнала finished - его держит _running, а не пул
+        self.setAutoDelete(False)
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.signals = WorkerSignals()
+        self.owners = ()
+        self._cancelled = False
+        self._detached = False
+
+    @classmethod
+    def with_progress(cls, fn, *args, **kwargs):
+        # fn принимает progress_callback и cancelled - как download_homework_file и submit_pipeline
+        worker = cls(fn, *args, **kwargs)
+        worker.kwargs.update(progress_callback=worker.report_progress, cancelled=worker.is_cancelled)
+        return worker
+
+    def report_progress(self, *values):
+        self.signals.progress.emit(values)
+
+    def cancel(self):
+        self._cancelled = True
+
+    def is_cancelled(self):
+        return self._cancelled
+
+    def is_detached(self):
+        return self._detached
+
+    def detach(self, cancel=True):
+        # владелец закрывается: результат задачи никуда не доставляется; cancel=False - задача доработает в фоне
+        self._detached = True
+        if cancel:
+            self.cancel()
+        for signal in (self.signals.result, self.signals.error, self.signals.progress):
+            try:
+                signal.disconnect()
+            except TypeError:
+                pass
+
+    def run(self):
+        try:
+            result = self.fn(*self.args, **self.kwargs)
+        except Exception as e:
+            print(f"Ошибка фоновой задачи: {e}")
+            self.signals.error.emit(str(e))
+        else:
+            self.signals.result.emit(result)
+        finally:
+            self.signals.finished.emit()
+
+    def start(self, *owners):
+        # owners - виджеты, которые показывают состояние загрузки, пока задача идет
+        self.owners = owners
+        for owner in owners:
+            set_loading(owner, True)
+        _running.add(self)
+        self.signals.finished.connect(self._on_finished)
+        QThreadPool.globalInstance().start(self)
+        return self
+
+    def _on_finished(self):
+        _running.discard(self)
+        for owner in self.owners:
+            try:
+                set_loading(owner, False)
+            except RuntimeError:
+                # виджет уже удален
+                pass
+
+def run_in_background(fn, *args, on_result=None, on_error=None, owners=(), **kwargs):
+    worker = Worker(fn, *args, **kwargs)
+    if on_result:
+        worker.signals.result.connect(on_result)
+    if on_error:
+        worker.signals.error.connect(on_error)
+    return worker.start(*owners)